@@ -4,26 +4,33 @@ AI-powered documentation updater
 Now uses ai_utils.py for unified AI client management and prompt templates
 """
 
-import os
 import sys
 import argparse
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 import subprocess
 
 try:
     import yaml
     from ai_utils import AIClient
+    from doc_cache import DocCache
+    from doc_transaction import DocumentTransaction
+    from readme_variables import VariablesSection
+    from update_changelog import update_changelog
 except ImportError as e:
     print(f"Error: Missing required package: {e}")
     sys.exit(1)
 
 
 class AIDocUpdater:
-    def __init__(self, version: str):
+    def __init__(self, version: str, docs: Optional[DocumentTransaction] = None):
         self.version = version
 
+        # Every README / LICENSE / CHANGELOG edit is staged here and written once
+        self.docs = docs or DocumentTransaction()
+
         # Initialize AI client
         try:
             self.ai_client = AIClient()
@@ -32,6 +39,9 @@ class AIDocUpdater:
             print(f"Warning: AI client initialization failed: {e}")
             self.ai_client = None
 
+        # Per-variable documentation responses, reused when a run is repeated
+        self.cache = DocCache.from_env()
+
     def get_recent_changes(self) -> Dict:
         """Get recent changes from git"""
         try:
@@ -89,11 +99,10 @@ class AIDocUpdater:
 
         # Check defaults/main.yml
         defaults_file = 'defaults/main.yml'
-        if os.path.exists(defaults_file):
+        if self.docs.exists(defaults_file):
             try:
                 # Get current variables
-                with open(defaults_file, 'r') as f:
-                    current_vars = yaml.safe_load(f) or {}
+                current_vars = yaml.safe_load(self.docs.get(defaults_file)) or {}
 
                 # Try to get previous version
                 try:
@@ -130,8 +139,24 @@ class AIDocUpdater:
 
         return changes
 
+    @staticmethod
+    def format_default(value: Any) -> str:
+        """Render a default value the way it is written in YAML"""
+        text = yaml.safe_dump(value, default_flow_style=True, width=1000).strip()
+        return text[:-4].strip() if text.endswith('\n...') else text
+
+    @staticmethod
+    def clean_block(content: str) -> List[str]:
+        """Markdown lines of an AI block response, without fences or blank lines"""
+        return [line.rstrip() for line in content.strip().split('\n')
+                if line.strip() and not line.strip().startswith('```')]
+
     def update_readme_with_ai(self, var_changes: Dict[str, List[str]]) -> bool:
-        """Update README.md with AI assistance"""
+        """Update README.md with AI assistance
+
+        Only the blocks documenting changed variables are sent to the AI, one
+        small prompt per block, and the results are spliced back in place.
+        """
 
         if not self.ai_client or not self.ai_client.active_provider:
             print("🔄 AI not available for documentation updates")
@@ -142,112 +167,111 @@ class AIDocUpdater:
             return False
 
         readme_path = 'README.md'
-        if not os.path.exists(readme_path):
+        readme_content = self.docs.get(readme_path)
+        if readme_content is None:
             print("⚠️  README.md not found")
             return False
 
-        with open(readme_path, 'r') as f:
-            readme_content = f.read()
-
         # Load current variables
         defaults_file = 'defaults/main.yml'
         current_vars = {}
-        if os.path.exists(defaults_file):
+        if self.docs.exists(defaults_file):
             try:
-                with open(defaults_file, 'r') as f:
-                    current_vars = yaml.safe_load(f) or {}
+                current_vars = yaml.safe_load(self.docs.get(defaults_file)) or {}
             except Exception as e:
                 print(f"Warning: Could not load variables: {e}")
                 return False
 
-        # Extract current variables section
-        start_marker = '## Role Variables'
-        end_marker = '## Dependencies'
+        section = VariablesSection(readme_content)
+        if not section.found:
+            print("⚠️  Could not find Role Variables section to update")
+            return False
 
-        if start_marker in readme_content:
-            start_idx = readme_content.find(start_marker)
-            if end_marker in readme_content:
-                end_idx = readme_content.find(end_marker)
-                current_section = readme_content[start_idx:end_idx]
-            else:
-                # Look for next ## section
-                remaining = readme_content[start_idx:]
-                next_section = re.search(r'\n## ', remaining[3:])  # Skip the current ##
-                if next_section:
-                    current_section = remaining[:next_section.start() + 3]
-                else:
-                    current_section = remaining
-        else:
-            current_section = "No variables section found"
-
-        # Prepare template variables
-        new_var_list = []
-        for var in var_changes['added']:
-            value = current_vars.get(var, '...')
-            new_var_list.append(f"{var}: {value}")
-
-        template_variables = {
-            'new_variables': "\n".join(new_var_list) if new_var_list else "None",
-            'modified_variables': "\n".join(var_changes['modified']) if var_changes['modified'] else "None",
-            'removed_variables': "\n".join(var_changes['removed']) if var_changes['removed'] else "None",
-            'current_variables_section': current_section,
-            'version': self.version
-        }
+        changed = {var: kind for kind in ('added', 'modified', 'removed') for var in var_changes.get(kind, [])}
+
+        # Group the changes by the block that documents them
+        block_changes: Dict[int, List[str]] = {}
+        new_variables = []
+        for var, kind in changed.items():
+            if var in section.blocks:
+                for number in section.blocks[var]:
+                    block_changes.setdefault(number, []).append(var)
+            elif kind == 'added':
+                new_variables.append(var)
+
+        # Blocks that only documented removed variables are dropped without AI
+        replacements: Dict[int, List[str]] = {}
+        for number, names in list(block_changes.items()):
+            documented = {v for v in section.block_variables(number) if v in current_vars or v in changed}
+            if all(changed[v] == 'removed' for v in names) and documented <= set(names):
+                replacements[number] = []
+                del block_changes[number]
+
+        def describe(var: str) -> str:
+            if changed[var] == 'removed':
+                return f"- {var}: removed"
+            return f"- {var} ({changed[var]}), default: {self.format_default(current_vars.get(var))}"
+
+        def update_block(names: List[str], current_block: str) -> Optional[List[str]]:
+            content = self.cache.call_ai(self.ai_client, 'documentation_variable_update', {
+                'variable_changes': "\n".join(describe(var) for var in names),
+                'current_block': current_block,
+                'table_header': "\n".join(section.table_header) or "None",
+                'version': self.version
+            })
+            return None if content is None else self.clean_block(content)
+
+        print(f"🔍 Updating {len(block_changes) + len(new_variables)} variable blocks with AI...")
+
+        additions = []
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            block_futures = {number: executor.submit(update_block, names, section.lines[number])
+                             for number, names in block_changes.items()}
+            new_futures = {var: executor.submit(update_block, [var], "None (new variable)")
+                           for var in new_variables}
+
+            for number, future in block_futures.items():
+                lines = future.result()
+                if lines == [] and not any(v in current_vars for v in section.block_variables(number)):
+                    # An empty reply only drops a block whose variables are all gone
+                    replacements[number] = []
+                    continue
+                prefix = section.lines[number].lstrip()[:1]
+                if not lines or any(not line.lstrip().startswith(prefix) for line in lines):
+                    print(f"⚠️  Keeping the entry for {', '.join(block_changes[number])}, AI returned no usable update")
+                    continue
+                replacements[number] = lines
+
+            for var, future in new_futures.items():
+                lines = future.result()
+                if not lines or not all(line.lstrip().startswith('|') for line in lines) or f"`{var}`" not in lines[0]:
+                    print(f"⚠️  Could not document new variable {var}")
+                    continue
+                additions.extend(lines)
+
+        self.cache.save()
+
+        if not replacements and not additions:
+            print("⚠️  AI did not return updated content")
+            return False
 
-        try:
-            print("🔍 Updating documentation with AI...")
-
-            result = self.ai_client.call_ai('documentation_update', template_variables)
-
-            if result['content']:
-                updated_section = result['content']
-
-                # Replace the variables section
-                if start_marker in readme_content:
-                    start_idx = readme_content.find(start_marker)
-                    if end_marker in readme_content:
-                        end_idx = readme_content.find(end_marker)
-                        new_readme = readme_content[:start_idx] + updated_section + '\n\n' + readme_content[end_idx:]
-                    else:
-                        # Replace until next ## section or end of file
-                        remaining = readme_content[start_idx:]
-                        next_section = re.search(r'\n## ', remaining[3:])
-                        if next_section:
-                            end_idx = start_idx + next_section.start() + 3
-                            new_readme = readme_content[:start_idx] + updated_section + '\n\n' + readme_content[
-                                                                                                 end_idx:]
-                        else:
-                            new_readme = readme_content[:start_idx] + updated_section
-
-                    with open(readme_path, 'w') as f:
-                        f.write(new_readme)
-
-                    # Log usage if debugging is enabled
-                    if self.ai_client.config.get('debug', {}).get('estimate_costs', True):
-                        self.ai_client.log_debug_info()
-
-                    return True
-                else:
-                    print("⚠️  Could not find Role Variables section to update")
-                    return False
-            else:
-                print("⚠️  AI did not return updated content")
-                return False
+        self.docs.set(readme_path, section.splice(replacements, additions))
 
-        except Exception as e:
-            print(f"⚠️  AI documentation update failed: {e}")
-            return False
+        # Log usage if debugging is enabled
+        if self.ai_client.config.get('debug', {}).get('estimate_costs', True):
+            self.ai_client.log_debug_info()
+
+        return True
 
     def add_version_badge(self):
         """Update version badge in README"""
         readme_path = 'README.md'
-        if not os.path.exists(readme_path):
+        content = self.docs.get(readme_path)
+        if content is None:
             print("⚠️  README.md not found for badge update")
             return
 
         try:
-            with open(readme_path, 'r') as f:
-                content = f.read()
 
             # Update or add version badge
             version_badge = f"[![Galaxy Version](https://img.shields.io/badge/galaxy-v{self.version}-blue.svg)](https://galaxy.ansible.com/oatakan/rhel_template_build)"
@@ -269,8 +293,7 @@ class AIDocUpdater:
                     content = '\n'.join(lines)
                     print(f"✅ Added new version badge v{self.version}")
 
-            with open(readme_path, 'w') as f:
-                f.write(content)
+            self.docs.set(readme_path, content)
 
         except Exception as e:
             print(f"Warning: Could not update version badge: {e}")
@@ -281,10 +304,9 @@ class AIDocUpdater:
         updated_files = []
 
         for file_path in ['LICENSE', 'README.md']:
-            if os.path.exists(file_path):
+            content = self.docs.get(file_path)
+            if content is not None:
                 try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
 
                     # Only update if current year is not already present and Copyright exists
                     if current_year not in content and 'Copyright' in content:
@@ -296,8 +318,7 @@ class AIDocUpdater:
                         )
 
                         if updated_content != content:
-                            with open(file_path, 'w') as f:
-                                f.write(updated_content)
+                            self.docs.set(file_path, updated_content)
                             updated_files.append(file_path)
 
                 except Exception as e:
@@ -306,10 +327,13 @@ class AIDocUpdater:
         if updated_files:
             print(f"✅ Updated copyright year to {current_year} in: {', '.join(updated_files)}")
 
-    def run(self):
+    def run(self, show_diff: bool = False, changelog_entry: Optional[str] = None):
         """Main execution"""
         print(f"📚 Updating documentation for version {self.version}")
 
+        if changelog_entry:
+            update_changelog(self.version, changelog_entry, self.docs)
+
         # Get recent changes for context
         changes = self.get_recent_changes()
         print(f"ℹ️  Found {len(changes['commits'])} commits since {changes['last_tag'] or 'beginning'}")
@@ -339,6 +363,9 @@ class AIDocUpdater:
         # Update copyright year
         self.update_copyright_year()
 
+        # One write per changed file, or a diff for review
+        self.docs.commit(show_diff=show_diff)
+
         # Show usage summary if AI was used
         if self.ai_client and self.ai_client.usage_stats['requests'] > 0:
             usage = self.ai_client.get_usage_summary()
@@ -352,10 +379,17 @@ class AIDocUpdater:
 def main():
     parser = argparse.ArgumentParser(description='AI Documentation Updater')
     parser.add_argument('--version', required=True, help='Version number')
+    parser.add_argument('--changelog-entry-file', help='Also add this changelog entry to CHANGELOG.md')
+    parser.add_argument('--diff', action='store_true', help='Print a unified diff instead of writing files')
     args = parser.parse_args()
 
+    changelog_entry = None
+    if args.changelog_entry_file:
+        with open(args.changelog_entry_file, 'r') as f:
+            changelog_entry = f.read().strip()
+
     updater = AIDocUpdater(args.version)
-    updater.run()
+    updater.run(show_diff=args.diff, changelog_entry=changelog_entry)
 
 
 if __name__ == '__main__':
@@ -7,30 +7,68 @@ Now uses ai_utils.py for unified AI client management and prompt templates
 import os
 import sys
 import argparse
+import base64
 import json
 import re
-from typing import Dict, List, Optional
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
 
 try:
-    from github import Github
     import git
     import yaml
     from ai_utils import AIClient
+    from github_cache import create_github_client
+    from github_writes import WritePlan
+    from path_classifier import get_classifier
 except ImportError as e:
     print(f"Error: Missing required package: {e}")
     sys.exit(1)
 
 
+METADATA_PATTERN = re.compile(r'<!-- ai-metadata\n(.*?)\n-->', re.DOTALL)
+COMMENT_MARKER = '<!-- ai-pr-analysis -->'
+# The PR body is editable by the author, so the stored analysis is size-capped
+MAX_ENCODED_ANALYSIS = 256 * 1024
+MAX_ANALYSIS_BYTES = 1024 * 1024
+# Login of the Actions GITHUB_TOKEN, which cannot read /user
+DEFAULT_BOT_LOGIN = 'github-actions[bot]'
+
+# Ordered from least to most significant, used when merging delta analyses
+CHANGE_TYPE_ORDER = ['chore', 'enhancement', 'bugfix', 'feature', 'breaking']
+RISK_LEVEL_ORDER = ['low', 'medium', 'high']
+MERGED_LIST_LIMIT = 10
+
+
 class AIPRAnalyzer:
-    def __init__(self, pr_number: int):
+    def __init__(self, pr_number: int, local_diff: bool = False):
         self.pr_number = pr_number
+        self.local_diff = local_diff
         self.github_token = os.environ.get('GITHUB_TOKEN')
         self.repo_name = os.environ.get('GITHUB_REPOSITORY')
 
         # Initialize GitHub client
-        self.github = Github(self.github_token)
+        self.github = create_github_client(self.github_token)
         self.repo = self.github.get_repo(self.repo_name)
         self.pr = self.repo.get_pull(pr_number)
+        self._changed_files = None
+        self._bot_login = None
+
+        # Set when only the commits pushed since the last analysis are analyzed
+        self.delta_base = None
+        self._delta_comparison = None
+
+        # Local checkout for computing the diff without the files API
+        self.local_repo = None
+        self.diff_range = None
+        if self.local_diff:
+            try:
+                self.local_repo = git.Repo('.')
+                self.diff_range = self._get_local_diff_range()
+                print(f"📂 Using local git diff {self.diff_range[0][:8]}..{self.diff_range[1][:8]}")
+            except Exception as e:
+                print(f"Warning: Local diff unavailable, using GitHub API: {e}")
+                self.local_repo = None
+                self.diff_range = None
 
         # Initialize AI client
         try:
@@ -40,11 +78,187 @@ class AIPRAnalyzer:
             print(f"Warning: AI client initialization failed: {e}")
             self.ai_client = None
 
+    def _get_local_diff_range(self) -> Tuple[str, str]:
+        """Resolve the merge base and head commits of the PR in the local checkout"""
+        head_sha = self.pr.head.sha
+        base_sha = self.pr.base.sha
+
+        merge_bases = self.local_repo.merge_base(base_sha, head_sha)
+        if not merge_bases:
+            raise ValueError(f"No merge base between {base_sha} and {head_sha}")
+
+        return merge_bases[0].hexsha, head_sha
+
+    def _get_api_files(self):
+        """Changed files from the API, for the whole PR or the delta"""
+        if self._delta_comparison is not None:
+            return self._delta_comparison.files
+        return self.pr.get_files()
+
+    def parse_metadata(self) -> Dict:
+        """Read the ai-metadata block from the PR body, including the stored analysis"""
+        match = METADATA_PATTERN.search(self.pr.body or "")
+        if not match:
+            return {}
+
+        try:
+            metadata = yaml.safe_load(match.group(1)) or {}
+        except yaml.YAMLError:
+            return {}
+
+        encoded = metadata.get('analysis')
+        if encoded:
+            metadata['analysis'] = self.decode_analysis(encoded)
+
+        return metadata
+
+    @staticmethod
+    def decode_analysis(encoded) -> Optional[Dict]:
+        """Decode a stored analysis, None when it is invalid or oversized"""
+        if not isinstance(encoded, str) or len(encoded) > MAX_ENCODED_ANALYSIS:
+            print("Warning: Stored analysis is missing or too large, analyzing the whole PR")
+            return None
+
+        try:
+            decompressor = zlib.decompressobj()
+            data = decompressor.decompress(base64.b64decode(encoded), MAX_ANALYSIS_BYTES)
+            if decompressor.unconsumed_tail or not decompressor.eof:
+                print("Warning: Stored analysis is too large or truncated, analyzing the whole PR")
+                return None
+            analysis = json.loads(data)
+        except Exception:
+            return None
+
+        return analysis if isinstance(analysis, dict) else None
+
+    @staticmethod
+    def encode_analysis(analysis: Dict) -> str:
+        """Compact encoding that is safe inside an HTML comment"""
+        return base64.b64encode(zlib.compress(json.dumps(analysis).encode('utf-8'))).decode('ascii')
+
+    def start_delta_analysis(self, last_sha: str) -> bool:
+        """Restrict the diff to commits pushed since last_sha, if it is still in the history"""
+        head_sha = self.pr.head.sha
+
+        try:
+            if self.diff_range:
+                if not self.local_repo.is_ancestor(last_sha, head_sha):
+                    return False
+                self.diff_range = (last_sha, head_sha)
+            else:
+                comparison = self.repo.compare(last_sha, head_sha)
+                if comparison.status != 'ahead':
+                    return False
+                self._delta_comparison = comparison
+        except Exception as e:
+            print(f"Warning: Could not compare with last analyzed commit: {e}")
+            return False
+
+        self.delta_base = last_sha
+        self._changed_files = None
+        return True
+
+    @staticmethod
+    def merge_analyses(previous: Dict, delta: Dict) -> Dict:
+        """Fold the analysis of new commits into the earlier analysis"""
+
+        def most_significant(order: List[str], a: str, b: str) -> str:
+            rank = {value: i for i, value in enumerate(order)}
+            return max(a, b, key=lambda value: rank.get(value, 0))
+
+        merged = dict(previous)
+        merged['change_type'] = most_significant(CHANGE_TYPE_ORDER, previous['change_type'], delta['change_type'])
+        merged['risk_level'] = most_significant(RISK_LEVEL_ORDER, previous['risk_level'], delta['risk_level'])
+        merged['latest_update'] = delta['summary']
+        merged['estimated_review_time'] = delta.get('estimated_review_time', previous.get('estimated_review_time'))
+
+        for key in ['testing_recommendations', 'code_quality_notes', 'compatibility_notes',
+                    'documentation_needs', 'suggested_reviewers']:
+            combined = list(dict.fromkeys(delta.get(key, []) + previous.get(key, [])))
+            merged[key] = combined[:MERGED_LIST_LIMIT]
+
+        return merged
+
+    @property
+    def bot_login(self) -> str:
+        """Login the analysis comments are posted as"""
+        if self._bot_login is None:
+            self._bot_login = os.environ.get('AI_PR_BOT_LOGIN', '')
+            if not self._bot_login:
+                try:
+                    self._bot_login = self.github.get_user().login
+                except Exception:
+                    self._bot_login = DEFAULT_BOT_LOGIN
+        return self._bot_login
+
+    def find_analysis_comment(self):
+        """Find the comment posted by an earlier run
+
+        Only our own comments count, others may quote the marker.
+        """
+        existing = None
+        for comment in self.pr.get_issue_comments():
+            if COMMENT_MARKER in (comment.body or "") and comment.user and comment.user.login == self.bot_login:
+                existing = comment
+        return existing
+
+    def get_changed_files(self) -> List[str]:
+        """Get the list of files changed by the PR"""
+        if self._changed_files is None:
+            if self.diff_range:
+                output = self.local_repo.git.diff('--name-only', '--no-renames', *self.diff_range)
+                self._changed_files = [line for line in output.splitlines() if line]
+            else:
+                self._changed_files = [f.filename for f in self._get_api_files()]
+
+        return self._changed_files
+
+    def iter_local_patches(self) -> Iterator[Tuple[str, str]]:
+        """Stream (filename, patch) pairs from git, one file at a time"""
+        process = self.local_repo.git.diff(
+            '--no-color', '--no-ext-diff', '--no-renames', *self.diff_range,
+            as_process=True
+        )
+
+        filename = None
+        patch_lines = []
+        for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\n')
+
+            if line.startswith('diff --git '):
+                if filename and patch_lines:
+                    yield filename, "\n".join(patch_lines)
+                # Fallback for binary files, which have no ---/+++ lines
+                filename = line.split(' b/', 1)[-1]
+                patch_lines = []
+            elif not patch_lines and line.startswith('--- a/'):
+                filename = line[len('--- a/'):].rstrip('\t')
+            elif not patch_lines and line.startswith('+++ b/'):
+                filename = line[len('+++ b/'):].rstrip('\t')
+            elif patch_lines or line.startswith('@@'):
+                # Match the files API, which returns patches starting at the first hunk
+                patch_lines.append(line)
+
+        if filename and patch_lines:
+            yield filename, "\n".join(patch_lines)
+
+        process.wait()
+
     def get_pr_diff(self) -> str:
         """Get the PR diff"""
-        files = self.pr.get_files()
         diff_content = []
 
+        if self.diff_range:
+            # Local patches are complete, the API ones are truncated by GitHub
+            for filename, patch in self.iter_local_patches():
+                diff_content.append(f"File: {filename}")
+                diff_content.append(patch)
+                diff_content.append("---")
+
+            return "\n".join(diff_content)
+
+        files = self._get_api_files()
+
         for file in files:
             if file.patch:
                 diff_content.append(f"File: {file.filename}")
@@ -60,11 +274,18 @@ class AIPRAnalyzer:
             print("🔄 AI not available, using basic analysis")
             return self.basic_analysis()
 
+        if self.delta_base:
+            scope = (f"Only the commits pushed since {self.delta_base[:8]}; "
+                     f"earlier changes in this PR were already analyzed")
+        else:
+            scope = "The full pull request"
+
         # Prepare template variables
         template_variables = {
             'pr_title': self.pr.title,
-            'pr_description': self.pr.body or 'No description provided',
-            'changed_files': "\n".join([f.filename for f in self.pr.get_files()]),
+            'pr_description': METADATA_PATTERN.sub('', self.pr.body or '').strip() or 'No description provided',
+            'analysis_scope': scope,
+            'changed_files': "\n".join(self.get_changed_files()),
             'diff_sample': diff[:3000]  # Limit diff size for token management
         }
 
@@ -94,7 +315,7 @@ class AIPRAnalyzer:
         """Fallback basic analysis without AI"""
         print("🔧 Using basic analysis")
 
-        files = list(self.pr.get_files())
+        files = self.get_changed_files()
 
         # Determine change type
         change_type = 'enhancement'
@@ -106,13 +327,7 @@ class AIPRAnalyzer:
             change_type = 'breaking'
 
         # Risk assessment based on files changed
-        risk_level = 'low'
-        critical_files = ['tasks/main.yml', 'defaults/main.yml', 'meta/main.yml']
-
-        if any(f.filename in critical_files for f in files):
-            risk_level = 'medium'
-        if any(f.filename.startswith('defaults/') for f in files):
-            risk_level = 'high'
+        risk_level = get_classifier().risk_level(files)
         if len(files) > 10:
             risk_level = 'high'
 
@@ -147,11 +362,16 @@ class AIPRAnalyzer:
         # Risk emoji
         risk_emoji = {'low': '🟢', 'medium': '🟡', 'high': '🔴'}.get(analysis['risk_level'], '⚪')
 
-        comment = f"""## 🤖 AI Pull Request Analysis
+        latest_update = ''
+        if analysis.get('latest_update'):
+            latest_update = f"\n### Latest Update\n{analysis['latest_update']}\n"
+
+        comment = f"""{COMMENT_MARKER}
+## 🤖 AI Pull Request Analysis
 
 ### Summary
 {analysis['summary']}
-
+{latest_update}
 ### Metadata
 - **Change Type:** {analysis['change_type'].title()}
 - **Risk Level:** {risk_emoji} {analysis['risk_level'].title()}
@@ -188,21 +408,25 @@ You can interact with the AI assistant using these commands in comments:
 
         return comment
 
-    def update_pr_description(self, analysis: Dict):
+    def build_pr_description(self, analysis: Dict) -> Optional[str]:
         """Enhance PR description with structured data"""
 
         current_body = self.pr.body or ""
 
-        # Don't update if already has our metadata
-        if "<!-- ai-metadata" in current_body:
-            return
-
-        metadata = f"""
-<!-- ai-metadata
+        metadata_block = f"""<!-- ai-metadata
 change_type: {analysis['change_type']}
 risk_level: {analysis['risk_level']}
 auto_generated: true
--->
+head_sha: '{self.pr.head.sha}'
+analysis: {self.encode_analysis(analysis)}
+-->"""
+
+        # Already enhanced, only refresh the metadata
+        if METADATA_PATTERN.search(current_body):
+            return METADATA_PATTERN.sub(lambda _: metadata_block, current_body, count=1)
+
+        metadata = f"""
+{metadata_block}
 
 ## AI-Enhanced Description
 
@@ -222,14 +446,10 @@ auto_generated: true
 - [ ] Security implications reviewed
 """
 
-        try:
-            self.pr.edit(body=metadata)
-            print("✅ Updated PR description")
-        except Exception as e:
-            print(f"Warning: Could not update PR description: {e}")
+        return metadata
 
-    def add_labels(self, analysis: Dict):
-        """Add appropriate labels based on analysis"""
+    def get_labels_for_analysis(self, analysis: Dict) -> List[str]:
+        """Pick appropriate labels based on analysis"""
 
         labels_to_add = []
 
@@ -254,50 +474,79 @@ auto_generated: true
         if analysis['documentation_needs']:
             labels_to_add.append('documentation')
 
-        # Add labels if they exist in the repo
-        try:
-            repo_labels = {label.name for label in self.repo.get_labels()}
-            added_labels = []
+        return labels_to_add
 
-            for label in labels_to_add:
-                if label in repo_labels:
-                    self.pr.add_to_labels(label)
-                    added_labels.append(label)
+    def add_labels(self, labels: List[str]):
+        """Add the labels that exist in the repo in a single call"""
+        repo_labels = {label.name for label in self.repo.get_labels()}
+        added_labels = [label for label in labels if label in repo_labels]
 
-            if added_labels:
-                print(f"✅ Added labels: {', '.join(added_labels)}")
+        if added_labels:
+            self.pr.add_to_labels(*added_labels)
+            print(f"✅ Added labels: {', '.join(added_labels)}")
 
-        except Exception as e:
-            print(f"Warning: Could not add labels: {e}")
+    def plan_writes(self, analysis: Dict) -> WritePlan:
+        """Collect every GitHub write for this analysis into one plan"""
+        plan = WritePlan()
 
-    def run(self):
+        comment = self.generate_pr_comment(analysis)
+        existing_comment = self.find_analysis_comment()
+        if existing_comment:
+            plan.add('comment', 'Update analysis comment', existing_comment.edit, comment,
+                     payload={'comment_id': existing_comment.id, 'body': comment},
+                     success_message="✅ Updated analysis comment")
+        else:
+            plan.add('comment', 'Post analysis comment', self.pr.create_issue_comment, comment,
+                     payload={'body': comment}, success_message="✅ Posted analysis comment")
+
+        description = self.build_pr_description(analysis)
+        if description:
+            plan.add('description', 'Update PR description', self.pr.edit, body=description,
+                     payload={'body': description}, success_message="✅ Updated PR description")
+
+        labels = self.get_labels_for_analysis(analysis)
+        if labels:
+            # Only labels that already exist in the repo are applied
+            plan.add('labels', 'Add labels', self.add_labels, labels,
+                     payload={'labels': labels}, success_message='')
+
+        return plan
+
+    def run(self, dry_run: bool = False):
         """Main execution flow"""
         print(f"🔍 Analyzing PR #{self.pr_number}: {self.pr.title}")
 
+        # Only analyze what changed since the last analyzed head
+        metadata = self.parse_metadata()
+        previous = metadata.get('analysis')
+        last_sha = metadata.get('head_sha')
+
+        if previous and last_sha == self.pr.head.sha:
+            print(f"ℹ️  Head {last_sha[:8]} was already analyzed, nothing to do")
+            return
+
+        if previous and last_sha and self.start_delta_analysis(last_sha):
+            print(f"🔁 Analyzing changes since {last_sha[:8]}")
+
         # Get PR diff
         diff = self.get_pr_diff()
 
         # Analyze with AI
         analysis = self.analyze_pr_with_ai(diff)
+        if self.delta_base:
+            analysis = self.merge_analyses(previous, analysis)
 
         print(f"📊 Analysis complete:")
         print(f"  - Change Type: {analysis['change_type']}")
         print(f"  - Risk Level: {analysis['risk_level']}")
         print(f"  - Tests Needed: {len(analysis['testing_recommendations'])}")
 
-        # Generate and post comment
-        comment = self.generate_pr_comment(analysis)
-        try:
-            self.pr.create_issue_comment(comment)
-            print("✅ Posted analysis comment")
-        except Exception as e:
-            print(f"Warning: Could not post comment: {e}")
-
-        # Update PR description
-        self.update_pr_description(analysis)
-
-        # Add labels
-        self.add_labels(analysis)
+        # Post comment, update description and add labels together
+        plan = self.plan_writes(analysis)
+        if dry_run:
+            plan.print_dry_run()
+        else:
+            plan.execute()
 
         # Show usage summary if AI was used
         if self.ai_client and self.ai_client.usage_stats['requests'] > 0:
@@ -312,10 +561,14 @@ auto_generated: true
 def main():
     parser = argparse.ArgumentParser(description='AI PR Analyzer')
     parser.add_argument('--pr-number', type=int, required=True, help='PR number to analyze')
+    parser.add_argument('--local-diff', action='store_true',
+                        help='Compute the diff from the local git checkout instead of the files API')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the planned GitHub writes instead of making them')
     args = parser.parse_args()
 
-    analyzer = AIPRAnalyzer(args.pr_number)
-    analyzer.run()
+    analyzer = AIPRAnalyzer(args.pr_number, local_diff=args.local_diff)
+    analyzer.run(dry_run=args.dry_run)
 
 
 if __name__ == '__main__':
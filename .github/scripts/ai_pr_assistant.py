@@ -12,8 +12,10 @@ import json
 from typing import Optional, Dict
 
 try:
-    from github import Github
     from ai_utils import AIClient
+    from changelog_store import ChangelogStore, format_recent_entries
+    from github_cache import create_github_client
+    from path_classifier import get_classifier
 except ImportError as e:
     print(f"Error: Missing required package: {e}")
     sys.exit(1)
@@ -27,7 +29,7 @@ class AIPRAssistant:
         self.repo_name = os.environ.get('GITHUB_REPOSITORY')
 
         # Initialize clients
-        self.github = Github(self.github_token)
+        self.github = create_github_client(self.github_token)
         self.repo = self.github.get_repo(self.repo_name)
         self.pr = self.repo.get_pull(pr_number)
 
@@ -49,25 +51,7 @@ class AIPRAssistant:
         files = list(self.pr.get_files())
 
         # Categorize files
-        file_categories = {
-            'tasks': [],
-            'vars': [],
-            'tests': [],
-            'docs': [],
-            'ci': []
-        }
-
-        for file in files:
-            if file.filename.startswith('tasks/'):
-                file_categories['tasks'].append(file.filename)
-            elif file.filename.startswith(('vars/', 'defaults/')):
-                file_categories['vars'].append(file.filename)
-            elif file.filename.startswith(('tests/', 'molecule/')):
-                file_categories['tests'].append(file.filename)
-            elif file.filename.endswith('.md') or file.filename.startswith('docs/'):
-                file_categories['docs'].append(file.filename)
-            elif file.filename.startswith('.github/'):
-                file_categories['ci'].append(file.filename)
+        file_categories = get_classifier().categorize(f.filename for f in files)
 
         return {
             'pr_title': self.pr.title,
@@ -233,6 +217,8 @@ Based on the changes in this PR, here are recommended test scenarios:
         print("📝 Generating changelog entry...")
 
         context = self.get_pr_context()
+        # Recent releases show the wording the changelog already uses
+        context['recent_entries'] = format_recent_entries(ChangelogStore().recent(2))
 
         if self.ai_client and self.ai_client.active_provider:
             try:
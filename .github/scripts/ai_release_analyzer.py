@@ -8,8 +8,10 @@ import os
 import sys
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 import subprocess
 
 try:
@@ -17,16 +19,39 @@ try:
     import semver
     import yaml
     from ai_utils import AIClient
+    from changelog_store import DEFAULT_STORE_PATH, ChangelogStore, format_recent_entries
+    from commit_classifier import get_commit_classifier
+    from path_classifier import get_classifier
+    from release_cache import ReleaseCache
 except ImportError as e:
     print(f"Error: Missing required package: {e}")
     print("Install with: pip install GitPython semver pyyaml")
     sys.exit(1)
 
 
+# Fields of a fused release_analysis_fused response and their types
+FUSED_RESPONSE_SCHEMA = {
+    'should_release': bool,
+    'version_bump': str,
+    'new_version': str,
+    'reasoning': str,
+    'breaking_changes': list,
+    'new_features': list,
+    'bug_fixes': list,
+    'changelog_entry': str,
+    'release_notes': str,
+}
+
+VERSION_BUMPS = ['patch', 'minor', 'major']
+
+
 class AIReleaseAnalyzer:
     def __init__(self):
         self.repo = git.Repo('.')
         self.github_token = os.environ.get('GITHUB_TOKEN')
+        self.commit_classifier = get_commit_classifier()
+        self.cache = ReleaseCache.for_repo(self.repo, self.commit_classifier.version)
+        self.changelog = ChangelogStore(os.path.join(self.repo.working_dir, DEFAULT_STORE_PATH))
 
         # Initialize AI client with configuration
         try:
@@ -36,162 +61,403 @@ class AIReleaseAnalyzer:
             print(f"Warning: AI client initialization failed: {e}")
             self.ai_client = None
 
+    def get_version_tags(self, merged: str = 'HEAD') -> List[Tuple[semver.Version, str, str]]:
+        """Index semver tags reachable from `merged`, highest version first"""
+        # One ref listing; %(*objectname) peels annotated tags to their commit
+        output = self.repo.git.for_each_ref(
+            '--format=%(refname:short) %(objectname) %(*objectname)',
+            f'--merged={merged}',
+            'refs/tags'
+        )
+
+        index = []
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) < 2 or not re.match(r'^v?\d+\.\d+\.\d+$', parts[0]):
+                continue
+            try:
+                version = semver.Version.parse(parts[0].lstrip('v'))
+            except ValueError:
+                # e.g. v1.02.0 matches the pattern but is not valid semver
+                print(f"Warning: Skipping tag {parts[0]}, not a semantic version")
+                continue
+            commit_sha = parts[2] if len(parts) > 2 else parts[1]
+            index.append((version, parts[0], commit_sha))
+
+        index.sort(key=lambda entry: entry[0], reverse=True)
+        return index
+
     def get_latest_tag(self) -> str:
-        """Get the latest version tag"""
+        """Get the highest version tag reachable from HEAD"""
         try:
-            tags = sorted(self.repo.tags, key=lambda t: t.commit.committed_datetime)
-            for tag in reversed(tags):
-                if re.match(r'^v?\d+\.\d+\.\d+$', tag.name):
-                    return tag.name
-        except:
-            pass
+            index = self.get_version_tags()
+            if index:
+                return index[0][1]
+        except Exception as e:
+            print(f"Warning: Could not read version tags: {e}")
         return 'v0.0.0'
 
-    def get_commits_since_tag(self, tag: str) -> List[git.Commit]:
-        """Get all commits since the last tag"""
+    @staticmethod
+    def get_rev_range(tag: str) -> str:
+        """Revision range covered by the release"""
+        return 'HEAD' if tag == 'v0.0.0' else f'{tag}..HEAD'
+
+    def iter_files_by_commit(self, rev_range: str) -> Iterator[Tuple[str, List[str]]]:
+        """Stream (commit sha, changed paths) from a single git log pass"""
+        for commit in self.iter_commits(rev_range):
+            yield commit['sha'], commit['files']
+
+    def iter_commits(self, rev_range: str, reverse: bool = False, files: bool = True) -> Iterator[Dict]:
+        """Stream commits of a range, newest first, with the paths each one touched"""
+        options = ['--format=%x00%H%x1f%B%x1e']
+        if files:
+            options = ['--name-only', '--no-renames', '--diff-merges=first-parent'] + options
+        if reverse:
+            options.append('--reverse')
+
+        # Unquoted paths so they match the classifier rules
+        process = self.repo.git(c='core.quotePath=false').log(*options, rev_range, as_process=True)
+
+        commit = None
+        message_lines = None
+        for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\n')
+
+            if line.startswith('\x00'):
+                if commit:
+                    yield commit
+                sha, _, line = line[1:].partition('\x1f')
+                commit = {'sha': sha, 'summary': '', 'message': '', 'files': []}
+                message_lines = []
+
+            if message_lines is not None:
+                # Still inside the message, which ends at the record separator
+                text, end, _ = line.partition('\x1e')
+                message_lines.append(text)
+                if end:
+                    commit['message'] = '\n'.join(message_lines).strip()
+                    commit['summary'] = commit['message'].split('\n', 1)[0]
+                    message_lines = None
+            elif line and commit:
+                commit['files'].append(line)
+
+        if commit:
+            yield commit
+
+        process.wait()
+
+    def summarize_commits(self, tag: str, list_limit: int = 5, progress_every: int = 10000) -> Dict:
+        """Classify commits in one streamed pass
+
+        Only counters and capped lists are kept, so memory stays flat no matter
+        how long the range is. Changed files come from get_changed_files.
+        """
+        summary = self.new_summary(tag)
+        for commit in self.iter_commits(summary['rev_range'], files=False):
+            self.add_to_summary(summary, commit, list_limit)
+            if summary['commit_count'] % progress_every == 0:
+                print(f"   … {summary['commit_count']} commits read")
+        return summary
+
+    def new_summary(self, tag: str) -> Dict:
+        return {
+            'tag': tag,
+            'rev_range': self.get_rev_range(tag),
+            'commit_count': 0,
+            'version_bump': 'patch',
+            'breaking_changes': [],
+            'new_features': [],
+            'bug_fixes': [],
+            'counts': {'breaking': 0, 'feature': 0, 'fix': 0, 'other': 0}
+        }
+
+    def add_to_summary(self, summary: Dict, commit: Dict, list_limit: int = 5):
+        """Classify one commit, through the cache, into the summary"""
+        lists = {'breaking': 'breaking_changes', 'feature': 'new_features', 'fix': 'bug_fixes'}
+        summary['commit_count'] += 1
+
+        cached = self.cache.get_commit(commit['sha'])
+        if cached:
+            kind = cached['category']
+        else:
+            result = self.commit_classifier.classify(commit['message'])
+            kind = result['category']
+            self.cache.set_commit(commit['sha'], kind, result['breaking'], commit['summary'])
+
+        summary['counts'][kind] += 1
+        if kind in lists and len(summary[lists[kind]]) < list_limit:
+            summary[lists[kind]].append(commit['summary'])
+
+        if summary['counts']['breaking']:
+            summary['version_bump'] = 'major'
+        elif summary['counts']['feature']:
+            summary['version_bump'] = 'minor'
+
+    def get_changed_files(self, tag: str, per_commit: bool = False) -> Dict[str, List[str]]:
+        """Categorize files changed since the tag
+
+        By default this is one tree-to-tree diff of the release range; with
+        per_commit every path touched by any commit is collected instead.
+        """
+        if per_commit:
+            paths = (path for _, files in self.iter_files_by_commit(self.get_rev_range(tag)) for path in files)
+        elif tag == 'v0.0.0':
+            # First release, everything in HEAD is new
+            paths = self.repo.git.ls_files('--with-tree=HEAD').splitlines()
+        else:
+            paths = self.repo.git(c='core.quotePath=false').diff('--name-only', '--no-renames', tag, 'HEAD').splitlines()
+
+        # Deduplicated and grouped by the shared classifier
+        return get_classifier().categorize(paths)
+
+    def call_ai_cached(self, task_name: str, template_variables: Dict,
+                       validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """Call the AI, reusing the response from an earlier run over the same input"""
+        return self.cache.call_ai(self.ai_client, task_name, template_variables, validate)
+
+    @staticmethod
+    def bump_version(tag: str, version_bump: str) -> str:
+        """Tag of the next version after a bump"""
         try:
-            if tag == 'v0.0.0':
-                # First release, get all commits
-                return list(self.repo.iter_commits('HEAD'))
-            return list(self.repo.iter_commits(f'{tag}..HEAD'))
+            v = semver.Version.parse(tag.lstrip('v'))
+            if version_bump == 'major':
+                new_version = str(v.bump_major())
+            elif version_bump == 'minor':
+                new_version = str(v.bump_minor())
+            else:
+                new_version = str(v.bump_patch())
         except:
-            return []
-
-    def get_changed_files(self, commits: List[git.Commit]) -> Dict[str, List[str]]:
-        """Categorize changed files"""
-        changes = {
-            'tasks': [],
-            'vars': [],
-            'defaults': [],
-            'meta': [],
-            'tests': [],
-            'docs': [],
-            'ci': [],
-            'other': []
-        }
+            new_version = '0.1.0'
 
-        for commit in commits:
-            try:
-                for item in commit.diff(commit.parents[0] if commit.parents else None):
-                    path = item.a_path or item.b_path
-                    if not path:
-                        continue
+        return f'v{new_version}'
 
-                    if path.startswith('tasks/'):
-                        changes['tasks'].append(path)
-                    elif path.startswith('vars/') or path.startswith('defaults/'):
-                        changes['vars'].append(path)
-                    elif path.startswith('meta/'):
-                        changes['meta'].append(path)
-                    elif path.startswith('tests/') or path.startswith('molecule/'):
-                        changes['tests'].append(path)
-                    elif path.endswith('.md') or path.startswith('docs/'):
-                        changes['docs'].append(path)
-                    elif path.startswith('.github/'):
-                        changes['ci'].append(path)
-                    else:
-                        changes['other'].append(path)
-            except Exception:
-                # Skip commits that can't be processed
-                continue
+    def validate_fused_response(self, content: str, tag: str) -> Optional[Dict]:
+        """Parse a fused response, returning None unless it matches the schema"""
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            print(f"⚠️  Fused response is not valid JSON: {e}")
+            return None
+
+        errors = [f"{field} should be {kind.__name__}" for field, kind in FUSED_RESPONSE_SCHEMA.items()
+                  if not isinstance(data.get(field), kind)]
+        if not errors:
+            if data['version_bump'] not in VERSION_BUMPS:
+                errors.append(f"unknown version_bump '{data['version_bump']}'")
+            elif data['new_version'] != self.bump_version(tag, data['version_bump']):
+                errors.append(f"new_version {data['new_version']} does not match a {data['version_bump']} bump")
+            elif not data['release_notes'].strip() or not data['changelog_entry'].strip():
+                errors.append("empty changelog_entry or release_notes")
+
+        if errors:
+            print(f"⚠️  Fused response rejected: {'; '.join(errors)}")
+            return None
+        return data
+
+    def analyze_fused(self, summary: Dict, scope: str, commit_text: str, shared_variables: Dict) -> Optional[Dict]:
+        """Decide the bump and write the changelog and release notes in one call"""
+        tag = summary['tag']
+        template_variables = {
+            **shared_variables,
+            'current_version': tag,
+            'candidate_versions': "\n".join(f"- {bump}: {self.bump_version(tag, bump)}" for bump in VERSION_BUMPS),
+            'commit_scope': scope,
+            'commit_text': commit_text,
+            'previous_entry': format_recent_entries(self.changelog.recent(1))
+        }
 
-        # Deduplicate
-        for key in changes:
-            changes[key] = list(set(changes[key]))
+        # Only responses that pass validation are cached
+        parsed = {}
+
+        def validate(text: str) -> bool:
+            parsed['analysis'] = self.validate_fused_response(text, tag)
+            return parsed['analysis'] is not None
+
+        content = self.call_ai_cached('release_analysis_fused', template_variables, validate=validate)
+        if not content:
+            return None
+        if 'analysis' not in parsed:
+            parsed['analysis'] = self.validate_fused_response(content, tag)
+        return parsed['analysis']
+
+    def iter_commit_chunks(self, rev_range: str, max_tokens: int) -> Iterator[Tuple[str, str, List[Dict]]]:
+        """Split a range, oldest first, into (scope, commit list, commits) chunks under a token budget
+
+        Oldest-first chunks keep their boundaries as new commits land, so the
+        responses for earlier chunks stay cacheable between runs.
+        """
+        lines = []
+        commits = []
+        tokens = 0
+        first = 1
+        position = 0
+
+        for commit in self.iter_commits(rev_range, reverse=True):
+            line = f"- {commit['summary']}"
+            # Roughly four characters per token
+            cost = len(line) // 4 + 1
+            if lines and tokens + cost > max_tokens:
+                yield f"commits {first}-{position} since the last release, oldest first", "\n".join(lines), commits
+                lines = []
+                commits = []
+                tokens = 0
+                first = position + 1
+
+            lines.append(line)
+            commits.append(commit)
+            tokens += cost
+            position += 1
+
+        if lines:
+            yield f"commits {first}-{position} since the last release, oldest first", "\n".join(lines), commits
+
+    @staticmethod
+    def file_variables(changed_files: Dict[str, List[str]]) -> Dict[str, str]:
+        """File context of the analysis prompts"""
+        return {
+            'changes_summary': "\n".join(f"{category}: {len(files)} files changed"
+                                         for category, files in changed_files.items() if files),
+            'task_files': "\n".join(changed_files.get('tasks', []))
+        }
 
-        return changes
+    @staticmethod
+    def build_changelog_entry(breaking_changes: List[str], new_features: List[str], bug_fixes: List[str]) -> str:
+        """Format grouped changes as a changelog entry"""
+        changelog_parts = []
+        if breaking_changes:
+            changelog_parts.append("### Breaking Changes\n" + "\n".join(f"- {c}" for c in breaking_changes))
+        if new_features:
+            changelog_parts.append("### Added\n" + "\n".join(f"- {c}" for c in new_features))
+        if bug_fixes:
+            changelog_parts.append("### Fixed\n" + "\n".join(f"- {c}" for c in bug_fixes))
 
-    def analyze_with_ai(self, commits: List[git.Commit], changed_files: Dict[str, List[str]]) -> Dict:
-        """Use AI to analyze commits and determine version bump"""
+        return "\n\n".join(
+            changelog_parts) if changelog_parts else "### Changed\n- Minor updates and improvements"
 
-        if not self.ai_client or not self.ai_client.active_provider:
-            print("🔄 AI not available, using rule-based analysis")
-            return self.rule_based_analysis(commits, changed_files)
+    def merge_chunk_analyses(self, analyses: List[Dict]) -> Dict:
+        """Reduce per-chunk analyses into one release decision"""
+        if len(analyses) == 1:
+            return analyses[0]
 
-        # Prepare template variables
-        commit_messages = [f"- {c.summary}" for c in commits[:50]]  # Limit to 50 most recent
-        commit_text = "\n".join(commit_messages)
+        bump_order = ['patch', 'minor', 'major']
+        version_bump = max((a.get('version_bump', 'patch') for a in analyses),
+                           key=lambda bump: bump_order.index(bump) if bump in bump_order else 0)
 
-        # Prepare file changes summary
-        changes_summary = []
-        for category, files in changed_files.items():
-            if files:
-                changes_summary.append(f"{category}: {len(files)} files changed")
+        merged = {}
+        for key in ('breaking_changes', 'new_features', 'bug_fixes'):
+            merged[key] = list(dict.fromkeys(item for a in analyses for item in a.get(key) or []))
 
-        template_variables = {
-            'commit_text': commit_text,
-            'changes_summary': "\n".join(changes_summary),
-            'task_files': "\n".join(changed_files.get('tasks', [])[:10])
+        return {
+            "should_release": any(a.get('should_release') for a in analyses),
+            "version_bump": version_bump,
+            "reasoning": " ".join(a.get('reasoning', '') for a in analyses if a.get('reasoning')),
+            **merged,
+            "changelog_entry": self.build_changelog_entry(
+                merged['breaking_changes'], merged['new_features'], merged['bug_fixes']
+            )
         }
 
+    def analyze_with_ai(self, summary: Dict, changed_files: Dict[str, List[str]]) -> Dict:
+        """Use AI to analyze commits and determine version bump
+
+        The whole range is split into token-bounded chunks that are analyzed
+        concurrently and merged, so every commit is seen in about one call's time.
+        """
+
+        if not self.ai_client or not self.ai_client.active_provider:
+            print("🔄 AI not available, using rule-based analysis")
+            return self.rule_based_analysis(summary, changed_files)
+
+        settings = self.ai_client.config.get('release_analysis', {})
+        chunk_tokens = settings.get('chunk_tokens', 3000)
+        max_chunks = settings.get('max_chunks', 8)
+
+        def analyze_chunk(scope: str, commit_text: str, commits: List[Dict]) -> Dict:
+            # Only the chunk's own commits and files go into the prompt, so its
+            # cache key does not change when later commits land
+            chunk_files = get_classifier().categorize(path for commit in commits for path in commit['files'])
+            content = self.call_ai_cached('release_analysis', {
+                **self.file_variables(chunk_files),
+                'commit_scope': scope,
+                'commit_text': commit_text
+            })
+            if not content:
+                raise ValueError(f"no response for {scope}")
+            return json.loads(content)
+
         try:
             print("🔍 Analyzing with AI...")
 
-            # Use the AI client with prompt template
-            result = self.ai_client.call_ai('release_analysis', template_variables)
+            chunks = self.iter_commit_chunks(summary['rev_range'], chunk_tokens)
+            first_chunks = [chunk for chunk in (next(chunks, None), next(chunks, None)) if chunk]
+
+            # A release that fits one chunk gets its notes from the same call
+            if settings.get('fused', True) and len(first_chunks) == 1:
+                scope, commit_text, _ = first_chunks[0]
+                analysis = self.analyze_fused(summary, scope, commit_text, self.file_variables(changed_files))
+                if analysis:
+                    print("🧩 Analysis and release notes generated in one call")
+                    return analysis
+                print("🔄 Falling back to separate analysis and release notes calls")
+
+            with ThreadPoolExecutor(max_workers=settings.get('max_workers', 4)) as executor:
+                futures = []
+                # Commits past max_chunks, classified by rules while the AI runs
+                unsent = self.new_summary(summary['tag'])
+                unsent_files: Dict[str, None] = {}
+                for scope, commit_text, commits in chain(first_chunks, chunks):
+                    if len(futures) < max_chunks:
+                        futures.append(executor.submit(analyze_chunk, scope, commit_text, commits))
+                        continue
+                    for commit in commits:
+                        self.add_to_summary(unsent, commit)
+                        unsent_files.update(dict.fromkeys(commit['files']))
+                analyses = [future.result() for future in futures]
+
+            if unsent['commit_count']:
+                print(f"⚠️  Release exceeds {max_chunks} chunks of {chunk_tokens} tokens, "
+                      f"the newest {unsent['commit_count']} commits are covered by the rule-based classification")
+                analyses.append(self.rule_based_analysis(unsent, get_classifier().categorize(unsent_files)))
 
-            if result['content']:
-                analysis = json.loads(result['content'])
+            if len(analyses) > 1:
+                print(f"🧩 Merged {len(analyses)} chunk analyses")
+            analysis = self.merge_chunk_analyses(analyses)
 
-                # Log usage if debugging is enabled
-                if self.ai_client.config.get('debug', {}).get('estimate_costs', True):
-                    self.ai_client.log_debug_info()
+            # Log usage if debugging is enabled
+            if self.ai_client.config.get('debug', {}).get('estimate_costs', True):
+                self.ai_client.log_debug_info()
 
-                return analysis
-            else:
-                print("⚠️  AI analysis failed, falling back to rule-based")
-                return self.rule_based_analysis(commits, changed_files)
+            return analysis
 
         except Exception as e:
-            print(f"⚠️  AI analysis error: {e}")
-            return self.rule_based_analysis(commits, changed_files)
+            print(f"⚠️  AI analysis error: {e}, falling back to rule-based")
+            return self.rule_based_analysis(summary, changed_files)
 
-    def rule_based_analysis(self, commits: List[git.Commit], changed_files: Dict[str, List[str]]) -> Dict:
+    def rule_based_analysis(self, summary: Dict, changed_files: Dict[str, List[str]]) -> Dict:
         """Fallback rule-based analysis"""
         print("🔧 Using rule-based analysis")
 
-        version_bump = 'patch'
-        breaking_changes = []
-        new_features = []
-        bug_fixes = []
-
-        # Check commit messages for keywords
-        for commit in commits:
-            msg = commit.message.lower()
-
-            if any(word in msg for word in ['breaking', 'remove', 'drop support', '!:']):
-                version_bump = 'major'
-                breaking_changes.append(commit.summary)
-            elif any(word in msg for word in ['feat:', 'feature', 'add support', 'new']):
-                if version_bump != 'major':
-                    version_bump = 'minor'
-                new_features.append(commit.summary)
-            elif any(word in msg for word in ['fix:', 'bug', 'repair', 'correct']):
-                bug_fixes.append(commit.summary)
+        # Commit keywords were already classified while streaming the range
+        version_bump = summary['version_bump']
+        breaking_changes = summary['breaking_changes']
+        new_features = summary['new_features']
+        bug_fixes = summary['bug_fixes']
+        commit_count = summary['commit_count']
 
         # Check file changes
         if changed_files.get('vars') or changed_files.get('defaults'):
             if version_bump == 'patch':
                 version_bump = 'minor'  # Assume new vars are added with defaults
 
-        should_release = len(commits) > 0
+        should_release = commit_count > 0
 
         # Build changelog entry
-        changelog_parts = []
-        if breaking_changes:
-            changelog_parts.append("### Breaking Changes\n" + "\n".join(f"- {c}" for c in breaking_changes[:5]))
-        if new_features:
-            changelog_parts.append("### Added\n" + "\n".join(f"- {c}" for c in new_features[:5]))
-        if bug_fixes:
-            changelog_parts.append("### Fixed\n" + "\n".join(f"- {c}" for c in bug_fixes[:5]))
-
-        changelog_entry = "\n\n".join(
-            changelog_parts) if changelog_parts else "### Changed\n- Minor updates and improvements"
+        changelog_entry = self.build_changelog_entry(breaking_changes[:5], new_features[:5], bug_fixes[:5])
 
         return {
             "should_release": should_release,
             "version_bump": version_bump,
-            "reasoning": f"Found {len(commits)} commits with {version_bump} level changes",
+            "reasoning": f"Found {commit_count} commits with {version_bump} level changes",
             "breaking_changes": breaking_changes[:5],
             "new_features": new_features[:5],
             "bug_fixes": bug_fixes[:5],
@@ -201,6 +467,10 @@ class AIReleaseAnalyzer:
     def generate_release_notes(self, analysis: Dict, version: str) -> str:
         """Generate comprehensive release notes using AI or fallback"""
 
+        if analysis.get('release_notes'):
+            # Already written by the fused analysis call
+            return analysis['release_notes']
+
         if self.ai_client and self.ai_client.active_provider:
             try:
                 template_variables = {
@@ -208,10 +478,10 @@ class AIReleaseAnalyzer:
                     'analysis_results': json.dumps(analysis, indent=2)
                 }
 
-                result = self.ai_client.call_ai('release_notes', template_variables)
+                content = self.call_ai_cached('release_notes', template_variables)
 
-                if result['content']:
-                    return result['content']
+                if content:
+                    return content
 
             except Exception as e:
                 print(f"Warning: AI release notes generation failed: {e}")
@@ -243,39 +513,33 @@ ansible-galaxy install oatakan.rhel_template_build,{version}
         print("🚀 Starting release analysis...")
 
         latest_tag = self.get_latest_tag()
-        commits = self.get_commits_since_tag(latest_tag)
+        print(f"📊 Reading commits since {latest_tag}")
+        summary = self.summarize_commits(latest_tag)
 
-        if not commits and os.environ.get('FORCE_RELEASE', '').lower() != 'true':
+        if not summary['commit_count'] and os.environ.get('FORCE_RELEASE', '').lower() != 'true':
             with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
                 f.write("should_release=false\n")
             print("ℹ️  No commits since last release")
             return
 
-        print(f"📊 Analyzing {len(commits)} commits since {latest_tag}")
+        print(f"📊 Analyzing {summary['commit_count']} commits since {latest_tag}")
 
-        changed_files = self.get_changed_files(commits)
-        analysis = self.analyze_with_ai(commits, changed_files)
+        # Net changes of the range, so files added and removed again are left out
+        changed_files = self.get_changed_files(latest_tag)
+        analysis = self.analyze_with_ai(summary, changed_files)
 
         # Calculate new version
-        current_version = latest_tag.lstrip('v')
-        try:
-            v = semver.Version.parse(current_version)
-            if analysis['version_bump'] == 'major':
-                new_version = str(v.bump_major())
-            elif analysis['version_bump'] == 'minor':
-                new_version = str(v.bump_minor())
-            else:
-                new_version = str(v.bump_patch())
-        except:
-            new_version = '0.1.0'
-
-        new_version_tag = f'v{new_version}'
+        new_version_tag = self.bump_version(latest_tag, analysis['version_bump'])
 
         print(f"📋 Analysis: {analysis['version_bump']} bump → {new_version_tag}")
         print(f"💭 Reasoning: {analysis['reasoning']}")
 
         release_notes = self.generate_release_notes(analysis, new_version_tag)
 
+        # Saved before publishing, so a re-run after a failed publish is free
+        self.cache.save()
+        self.cache.log_summary()
+
         # Output for GitHub Actions
         github_output = os.environ.get('GITHUB_OUTPUT')
         if not github_output:
@@ -297,6 +561,10 @@ ansible-galaxy install oatakan.rhel_template_build,{version}
                   f"~${usage['estimated_cost_usd']}")
 
 
-if __name__ == '__main__':
+def main():
     analyzer = AIReleaseAnalyzer()
-    analyzer.run()
\ No newline at end of file
+    analyzer.run()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the compiled commit classifier
+Measures throughput on synthetic messages or a real git range and checks that
+compatible mode agrees with the legacy keyword scans
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+from typing import List
+
+from commit_classifier import CommitClassifier
+
+
+SYNTHETIC_HEADERS = [
+    'feat', 'feat(tasks)', 'feat!', 'fix', 'fix(cloud-init)', 'docs', 'chore', 'ci', 'refactor(vmware)',
+    'test', 'Update', 'Merge pull request #{n} from user/branch', 'Add support for', 'Remove', 'Fix',
+]
+SYNTHETIC_WORDS = [
+    'grow', 'partition', 'cloud-init', 'vmware', 'tools', 'new', 'variable', 'default', 'bug', 'network',
+    'cleanup', 'support', 'drop', 'EL10', 'correct', 'typo', 'repair', 'template', 'ovirt', 'feature',
+    'packages', 'selinux', 'breaking', 'removed', 'role', 'molecule', 'renewal', 'sysprep', 'udev', 'ssh',
+]
+
+
+def synthetic_messages(count: int, seed: int = 42) -> List[str]:
+    """Generate commit messages mixing conventional and free-form headers and bodies"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        header = rng.choice(SYNTHETIC_HEADERS).format(n=i)
+        subject = ' '.join(rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(3, 9)))
+        separator = ': ' if header[0].islower() else ' '
+        message = f"{header}{separator}{subject}"
+        if rng.random() < 0.4:
+            body = ' '.join(rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(10, 40)))
+            message += f"\n\n{body}"
+        if rng.random() < 0.02:
+            message += "\n\nBREAKING CHANGE: variables renamed"
+        messages.append(message)
+    return messages
+
+
+def range_messages(rev_range: str) -> List[str]:
+    """Full messages of every commit in a range"""
+    output = subprocess.check_output(['git', 'log', '--format=%B%x00', rev_range], text=True)
+    return [message.strip() for message in output.split('\x00') if message.strip()]
+
+
+def legacy_classify(message: str) -> str:
+    """The any() keyword scans rule_based_analysis used before the compiled classifier"""
+    msg = message.lower()
+    if any(word in msg for word in ['breaking', 'remove', 'drop support', '!:']):
+        return 'breaking'
+    elif any(word in msg for word in ['feat:', 'feature', 'add support', 'new']):
+        return 'feature'
+    elif any(word in msg for word in ['fix:', 'bug', 'repair', 'correct']):
+        return 'fix'
+    return 'other'
+
+
+def measure(label: str, func, messages: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(messages)
+        best = min(best, time.perf_counter() - start)
+
+    rate = len(messages) / best if best else float('inf')
+    print(f"  {label:<20} {best * 1000:9.1f} ms  {rate:12,.0f} messages/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Commit classifier benchmark')
+    parser.add_argument('--messages', type=int, default=100000, help='Number of synthetic messages')
+    parser.add_argument('--range', dest='rev_range', help='Classify the commits of a git range, e.g. v1.0.0..HEAD')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Messages per classify_batch call')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions, best is reported')
+    args = parser.parse_args()
+
+    messages = range_messages(args.rev_range) if args.rev_range else synthetic_messages(args.messages)
+    source = args.rev_range or 'synthetic'
+    print(f"📊 Classifying {len(messages):,} commit messages ({source}), best of {args.repeat}")
+
+    compatible = CommitClassifier('compatible')
+    strict = CommitClassifier('strict')
+
+    def batched(classifier):
+        def run(items):
+            for start in range(0, len(items), args.batch_size):
+                classifier.classify_batch(items[start:start + args.batch_size])
+        return run
+
+    measure('legacy any()', lambda items: [legacy_classify(m) for m in items], messages, args.repeat)
+    measure('compatible single', lambda items: [compatible.classify(m) for m in items], messages, args.repeat)
+    measure('compatible batch', batched(compatible), messages, args.repeat)
+    measure('strict batch', batched(strict), messages, args.repeat)
+
+    # Compatible mode must reproduce the legacy categories exactly
+    mismatches = []
+    for start in range(0, len(messages), args.batch_size):
+        chunk = messages[start:start + args.batch_size]
+        for message, result in zip(chunk, compatible.classify_batch(chunk)):
+            if result['category'] != legacy_classify(message):
+                mismatches.append(message)
+
+    strict_changes = sum(
+        result['category'] != legacy_classify(message)
+        for message, result in zip(messages, strict.classify_batch(messages))
+    )
+    print(f"  strict mode reclassifies {strict_changes:,} of {len(messages):,} messages")
+
+    if mismatches:
+        print(f"❌ Compatible mode disagrees with the legacy rules on {len(mismatches)} messages, e.g. "
+              f"{mismatches[0].splitlines()[0]!r}")
+        sys.exit(1)
+    print("✅ Compatible mode matches the legacy keyword rules")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Per-task timing benchmark for the role's molecule converge
+Runs converge for each distro of the CI matrix with the template_trace
+callback, records per-task and per-include durations as JSON and compares
+runs against a baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROLE_ROOT = Path(__file__).resolve().parents[2]
+
+# Same images as the test-docker matrix in ci.yml
+DISTROS = {
+    'rhel-8': 'registry.access.redhat.com/ubi8/ubi-init:latest',
+    'rhel-9': 'registry.access.redhat.com/ubi9/ubi-init:latest',
+    'rhel-10': 'registry.access.redhat.com/ubi10/ubi-init:latest',
+    'rockylinux-8': 'quay.io/rockylinux/rockylinux:8',
+    'rockylinux-9': 'quay.io/rockylinux/rockylinux:9',
+    'rockylinux-10': 'quay.io/rockylinux/rockylinux:10',
+    'almalinux-8': 'quay.io/almalinuxorg/almalinux:8',
+    'almalinux-9': 'quay.io/almalinuxorg/almalinux:9',
+    'almalinux-10': 'quay.io/almalinuxorg/almalinux:10',
+}
+
+PLAYBOOK_FILE = '(playbook)'
+RESULTS_VERSION = 1
+
+
+def read_trace(path: str, role_root: Path) -> List[Tuple[str, str, float]]:
+    """(file, task name, seconds) for every task in a template_trace JSON Lines file"""
+    durations = []
+    tasks_dir = str(role_root / 'tasks')
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            # Task paths look like /path/to/role/tasks/main.yml:12
+            task_file = (event.get('path') or '').rsplit(':', 1)[0]
+            if os.path.dirname(task_file) == tasks_dir:
+                file_name = os.path.basename(task_file)
+            else:
+                file_name = PLAYBOOK_FILE
+            durations.append((file_name, event['task'], event['duration']))
+    return durations
+
+
+def summarize_run(durations: List[Tuple[str, str, float]]) -> Dict:
+    """Per-task and per-file totals of one converge"""
+    tasks: Dict[str, float] = {}
+    files: Dict[str, float] = {}
+    for file_name, name, seconds in durations:
+        key = f"{file_name}: {name}"
+        tasks[key] = tasks.get(key, 0.0) + seconds
+        files[file_name] = files.get(file_name, 0.0) + seconds
+    return {'total': sum(files.values()), 'tasks': tasks, 'files': files}
+
+
+def median_runs(runs: List[Dict]) -> Dict:
+    """Median of each duration over several runs"""
+    def median_of(section: str) -> Dict[str, float]:
+        keys = set().union(*(run[section] for run in runs))
+        return {key: round(statistics.median(run[section].get(key, 0.0) for run in runs), 3) for key in sorted(keys)}
+
+    return {
+        'runs': len(runs),
+        'total': round(statistics.median(run['total'] for run in runs), 3),
+        'tasks': median_of('tasks'),
+        'files': median_of('files'),
+    }
+
+
+def molecule(command: str, scenario: str, env: Dict[str, str]):
+    subprocess.run(['molecule', command, '--scenario-name', scenario], cwd=ROLE_ROOT, env=env, check=True)
+
+
+def run_distro(name: str, image: str, runs: int, scenario: str, trace_dir: Path) -> Dict:
+    """Converge a fresh instance of one distro per run and time each task"""
+    env = dict(os.environ)
+    env.update({
+        'MOLECULE_DISTRO': image,
+        'TEMPLATE_TRACE_FORMAT': 'jsonl',
+    })
+
+    summaries = []
+    for run in range(1, runs + 1):
+        print(f"🔍 {name}: converge run {run}/{runs}")
+        trace_path = trace_dir / f"{name}-{run}.jsonl"
+        if trace_path.exists():
+            trace_path.unlink()
+        try:
+            molecule('create', scenario, env)
+            molecule('prepare', scenario, env)
+            env['TEMPLATE_TRACE_FILE'] = str(trace_path)
+            molecule('converge', scenario, env)
+        finally:
+            env.pop('TEMPLATE_TRACE_FILE', None)
+            molecule('destroy', scenario, env)
+        summaries.append(summarize_run(read_trace(str(trace_path), ROLE_ROOT)))
+
+    summary = median_runs(summaries)
+    summary['image'] = image
+    print(f"✅ {name}: {summary['total']:.1f}s over {len(summary['tasks'])} tasks")
+    return summary
+
+
+def load_results(paths: List[str]) -> Dict:
+    """Merge results files, later files overriding distros of earlier ones"""
+    merged = {'version': RESULTS_VERSION, 'distros': {}}
+    for path in paths:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        merged['distros'].update(data.get('distros', {}))
+        merged['generated'] = data.get('generated')
+    return merged
+
+
+def write_results(path: str, results: Dict):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"✅ Wrote {path}")
+
+
+def compare(baseline: Dict, current: Dict, threshold_pct: float, threshold_seconds: float,
+            top: int) -> Tuple[str, List[str]]:
+    """Markdown report of the slowest tasks and the regressions against a baseline"""
+    lines = ["## ⏱️ Converge timing", ""]
+    regressions = []
+
+    for distro, result in sorted(current['distros'].items()):
+        base = baseline.get('distros', {}).get(distro)
+        lines.append(f"### {distro}: {result['total']:.1f}s"
+                     + (f" (baseline {base['total']:.1f}s)" if base else " (no baseline)"))
+        lines.append("")
+        lines.append("| Task file | Time (s) | Baseline (s) | Change |")
+        lines.append("|-----------|----------|--------------|--------|")
+        for file_name, seconds in sorted(result['files'].items(), key=lambda item: -item[1]):
+            lines.append(format_row(file_name, seconds, base['files'].get(file_name) if base else None))
+        lines.append("")
+
+        lines.append(f"Slowest {top} tasks:")
+        lines.append("")
+        lines.append("| Task | Time (s) | Baseline (s) | Change |")
+        lines.append("|------|----------|--------------|--------|")
+        for key, seconds in sorted(result['tasks'].items(), key=lambda item: -item[1])[:top]:
+            lines.append(format_row(key, seconds, base['tasks'].get(key) if base else None))
+        lines.append("")
+
+        if not base:
+            continue
+        for section in ('files', 'tasks'):
+            for key, seconds in result[section].items():
+                before = base[section].get(key)
+                if before is None:
+                    continue
+                delta = seconds - before
+                if delta > threshold_seconds and (before == 0 or delta / before * 100 > threshold_pct):
+                    regressions.append(f"{distro} {key}: {before:.1f}s -> {seconds:.1f}s")
+
+    if regressions:
+        lines.append(f"### ⚠️ Regressions (> {threshold_seconds:g}s and > {threshold_pct:g}%)")
+        lines.append("")
+        lines.extend(f"- {regression}" for regression in regressions)
+    else:
+        lines.append("✅ No regressions against the baseline")
+
+    return "\n".join(lines) + "\n", regressions
+
+
+def format_row(key: str, seconds: float, before: Optional[float]) -> str:
+    if before is None:
+        return f"| {key} | {seconds:.1f} | - | new |"
+    change = f"{(seconds - before) / before * 100:+.0f}%" if before else f"{seconds - before:+.1f}s"
+    return f"| {key} | {seconds:.1f} | {before:.1f} | {change} |"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time molecule converge per task and compare against a baseline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Converge distros and record per-task durations')
+    run_parser.add_argument('--distro', action='append', choices=sorted(DISTROS),
+                            help='Distro to converge (repeatable, default: all)')
+    run_parser.add_argument('--runs', type=int, default=1, help='Converges per distro; the median is kept')
+    run_parser.add_argument('--scenario', default='default', help='Molecule scenario')
+    run_parser.add_argument('--output', required=True, help='Results JSON file')
+    run_parser.add_argument('--trace-dir', default='bench/traces', help='Where the raw execution traces are kept')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare results against a baseline')
+    compare_parser.add_argument('results', nargs='+', help='Results JSON files (merged)')
+    compare_parser.add_argument('--baseline', help='Baseline JSON file')
+    compare_parser.add_argument('--threshold-pct', type=float, default=25.0,
+                                help='Regression when slower by more than this percentage...')
+    compare_parser.add_argument('--threshold-seconds', type=float, default=2.0,
+                                help='...and by more than this many seconds')
+    compare_parser.add_argument('--top', type=int, default=15, help='Slowest tasks listed per distro')
+    compare_parser.add_argument('--write-baseline', help='Write the merged results here as the new baseline')
+    compare_parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 on regressions')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        trace_dir = Path(args.trace_dir).resolve()
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        results = {
+            'version': RESULTS_VERSION,
+            'generated': datetime.now(timezone.utc).isoformat(),
+            'distros': {}
+        }
+        for name in args.distro or sorted(DISTROS):
+            results['distros'][name] = run_distro(name, DISTROS[name], args.runs, args.scenario, trace_dir)
+        write_results(args.output, results)
+        return
+
+    current = load_results(args.results)
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    elif args.baseline:
+        print(f"ℹ️  No baseline at {args.baseline}")
+
+    report, regressions = compare(baseline, current, args.threshold_pct, args.threshold_seconds, args.top)
+    print(report)
+    summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+    if summary_path:
+        with open(summary_path, 'a') as f:
+            f.write(report)
+
+    if args.write_baseline:
+        write_results(args.write_baseline, current)
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for the PR automation scripts
+Runs ai_pr_analyzer.py and ai_pr_assistant.py against a local GitHub REST
+stand-in and a stub OpenAI-compatible endpoint, then reports wall time,
+API calls, AI calls and bytes moved for each PR size
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+SCRIPTS_DIR = Path(__file__).parent
+REPO_NAME = 'bench/rhel_template_build'
+DEFAULT_SIZES = [1, 10, 50, 100, 300]
+
+SYNTHETIC_DIRS = ['tasks', 'defaults', 'templates', 'molecule/default', 'docs', '.github/workflows']
+
+STUB_ANALYSIS = {
+    'summary': 'Synthetic PR used by the offline benchmark',
+    'change_type': 'enhancement',
+    'risk_level': 'medium',
+    'testing_recommendations': ['Run molecule tests'],
+    'code_quality_notes': [],
+    'compatibility_notes': [],
+    'documentation_needs': ['Update README'],
+    'suggested_reviewers': ['ansible-experts'],
+    'estimated_review_time': '15-30'
+}
+
+
+class FakeGitHubState:
+    """Synthetic repository data plus traffic counters"""
+
+    def __init__(self, ai_latency: float):
+        self.ai_latency = ai_latency
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.pulls: Dict[int, Dict[str, Any]] = {}
+            self.comments: Dict[int, Dict[str, Any]] = {}
+            self.next_comment_id = 1
+            self.counters = {
+                'api_calls': 0,
+                'api_writes': 0,
+                'api_not_modified': 0,
+                'ai_calls': 0,
+                'bytes_in': 0,
+                'bytes_out': 0
+            }
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counters[key] += amount
+
+    def get_pull(self, number: int) -> Dict[str, Any]:
+        """Create PR #number with `number` changed files on first access"""
+        with self.lock:
+            if number not in self.pulls:
+                files = []
+                for i in range(number):
+                    directory = SYNTHETIC_DIRS[i % len(SYNTHETIC_DIRS)]
+                    patch = "@@ -1,3 +1,4 @@\n---\n-- name: old task\n+- name: new task\n+  ansible.builtin.debug:\n" * 4
+                    files.append({
+                        'sha': f"{i:040x}",
+                        'filename': f"{directory}/file_{i}.yml",
+                        'status': 'modified',
+                        'additions': 8,
+                        'deletions': 4,
+                        'changes': 12,
+                        'patch': patch
+                    })
+                self.pulls[number] = {
+                    'title': f"feat: synthetic change touching {number} files",
+                    'body': 'Synthetic pull request for the offline benchmark',
+                    'head_sha': f"{number:040x}",
+                    'base_sha': f"{0:040x}",
+                    'files': files,
+                    'labels': []
+                }
+            return self.pulls[number]
+
+
+def make_handler(state: FakeGitHubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        @property
+        def base(self) -> str:
+            return f"http://{self.headers.get('Host')}"
+
+        def _read_body(self) -> Optional[Dict[str, Any]]:
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            state.count('bytes_in', length)
+            return json.loads(raw) if raw else None
+
+        def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload).encode('utf-8')
+
+            # Conditional GET support so the HTTP cache can be measured
+            if self.command == 'GET' and status == 200 and not self.path.startswith('/v1/'):
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                headers = dict(headers or {}, ETag=etag)
+                if self.headers.get('If-None-Match') == etag:
+                    state.count('api_not_modified')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            state.count('bytes_out', len(body))
+
+        def _repo_url(self) -> str:
+            return f"{self.base}/repos/{REPO_NAME}"
+
+        def _pull_json(self, number: int) -> Dict[str, Any]:
+            pull = state.get_pull(number)
+            repo_url = self._repo_url()
+            return {
+                'id': number,
+                'number': number,
+                'state': 'open',
+                'title': pull['title'],
+                'body': pull['body'],
+                'url': f"{repo_url}/pulls/{number}",
+                'issue_url': f"{repo_url}/issues/{number}",
+                'head': {'sha': pull['head_sha'], 'ref': 'feature'},
+                'base': {'sha': pull['base_sha'], 'ref': 'main'},
+                'additions': 8 * len(pull['files']),
+                'deletions': 4 * len(pull['files']),
+                'changed_files': len(pull['files'])
+            }
+
+        def _comment_json(self, comment: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                'id': comment['id'],
+                'body': comment['body'],
+                'url': f"{self._repo_url()}/issues/comments/{comment['id']}"
+            }
+
+        def _paginate(self, items: List[Any], query: Dict[str, List[str]], path: str):
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            chunk = items[(page - 1) * per_page:page * per_page]
+            last = max(1, -(-len(items) // per_page))
+
+            links = []
+            if page < last:
+                links.append(f'<{self.base}{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+                links.append(f'<{self.base}{path}?per_page={per_page}&page={last}>; rel="last"')
+            self._send(200, chunk, {'Link': ', '.join(links)} if links else None)
+
+        def _route(self, method: str):
+            parsed = urlparse(self.path)
+            path = parsed.path.rstrip('/')
+            query = parse_qs(parsed.query)
+            payload = self._read_body() if method in ('POST', 'PATCH') else None
+
+            if path.startswith('/v1/'):
+                return self._ai(path, payload)
+
+            state.count('api_calls')
+            if method != 'GET':
+                state.count('api_writes')
+
+            prefix = f"/repos/{REPO_NAME}"
+            if path == prefix:
+                return self._send(200, {'id': 1, 'name': REPO_NAME.split('/')[1],
+                                        'full_name': REPO_NAME, 'url': self._repo_url()})
+            if not path.startswith(prefix):
+                return self._send(404, {'message': 'Not Found'})
+            path = path[len(prefix):]
+
+            match = re.fullmatch(r'/pulls/(\d+)(/files)?', path)
+            if match:
+                number = int(match.group(1))
+                if match.group(2):
+                    return self._paginate(state.get_pull(number)['files'], query, parsed.path)
+                if method == 'PATCH' and payload:
+                    state.get_pull(number).update({k: v for k, v in payload.items() if k in ('title', 'body')})
+                return self._send(200, self._pull_json(number))
+
+            match = re.fullmatch(r'/issues/(\d+)/(comments|labels)', path)
+            if match:
+                number = int(match.group(1))
+                if match.group(2) == 'labels':
+                    pull = state.get_pull(number)
+                    pull['labels'].extend(payload or [])
+                    return self._send(200, [{'name': name} for name in pull['labels']])
+                if method == 'POST':
+                    with state.lock:
+                        comment = {'id': state.next_comment_id, 'issue': number, 'body': payload['body']}
+                        state.comments[comment['id']] = comment
+                        state.next_comment_id += 1
+                    return self._send(201, self._comment_json(comment))
+                comments = [self._comment_json(c) for c in state.comments.values() if c['issue'] == number]
+                return self._paginate(comments, query, parsed.path)
+
+            match = re.fullmatch(r'/issues/comments/(\d+)', path)
+            if match:
+                comment = state.comments[int(match.group(1))]
+                if method == 'PATCH' and payload:
+                    comment['body'] = payload['body']
+                return self._send(200, self._comment_json(comment))
+
+            if path == '/labels':
+                names = ['bug', 'enhancement', 'documentation', 'review-required', 'needs-careful-review']
+                return self._paginate([{'name': name, 'color': 'ededed'} for name in names], query, parsed.path)
+
+            return self._send(404, {'message': 'Not Found'})
+
+        def _ai(self, path: str, payload: Optional[Dict[str, Any]]):
+            """OpenAI-compatible chat completions stub"""
+            state.count('ai_calls')
+            time.sleep(state.ai_latency)
+
+            wants_json = bool(payload and payload.get('response_format'))
+            content = json.dumps(STUB_ANALYSIS) if wants_json else "- Looks good\n- Consider adding a molecule scenario"
+            prompt_tokens = sum(len(m.get('content', '')) for m in (payload or {}).get('messages', [])) // 4
+
+            return self._send(200, {
+                'id': 'chatcmpl-bench',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': (payload or {}).get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'finish_reason': 'stop',
+                    'message': {'role': 'assistant', 'content': content}
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': len(content) // 4,
+                    'total_tokens': prompt_tokens + len(content) // 4
+                }
+            })
+
+        def do_GET(self):
+            self._route('GET')
+
+        def do_POST(self):
+            self._route('POST')
+
+        def do_PATCH(self):
+            self._route('PATCH')
+
+    return Handler
+
+
+def run_script(args: List[str], env: Dict[str, str], verbose: bool) -> float:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / args[0])] + args[1:],
+        env=env,
+        cwd=SCRIPTS_DIR,
+        capture_output=not verbose,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout or '', result.stderr or '')
+        raise RuntimeError(f"{args[0]} exited with {result.returncode}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end benchmark for the PR scripts')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Changed files per synthetic PR')
+    parser.add_argument('--ai-latency', type=float, default=0.5, help='Seconds the stub AI takes per call')
+    parser.add_argument('--assistant-command', default='/ai review', help='Comment passed to ai_pr_assistant.py')
+    parser.add_argument('--http-cache', action='store_true', help='Enable the GitHub HTTP cache for the runs')
+    parser.add_argument('--runs', type=int, default=1, help='Runs per script and size, to show warm-cache runs')
+    parser.add_argument('--json', dest='json_output', help='Also write the results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show script output')
+    args = parser.parse_args()
+
+    state = FakeGitHubState(args.ai_latency)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    env = {k: v for k, v in os.environ.items() if k not in ('ANTHROPIC_API_KEY', 'GITHUB_HTTP_CACHE_DIR')}
+    env.update({
+        'GITHUB_TOKEN': 'bench-token',
+        'GITHUB_REPOSITORY': REPO_NAME,
+        'GITHUB_API_URL': base_url,
+        'OPENAI_API_KEY': 'bench-key',
+        'OPENAI_BASE_URL': f"{base_url}/v1",
+        'PYTHONUNBUFFERED': '1'
+    })
+
+    cache_dir = None
+    if args.http_cache:
+        cache_dir = tempfile.TemporaryDirectory(prefix='bench-github-cache-')
+        env['GITHUB_HTTP_CACHE_DIR'] = cache_dir.name
+
+    scenarios = [
+        ('analyzer', lambda n: ['ai_pr_analyzer.py', '--pr-number', str(n)]),
+        ('assistant', lambda n: ['ai_pr_assistant.py', '--pr-number', str(n), '--comment', args.assistant_command]),
+    ]
+
+    results = []
+    print(f"📊 Offline benchmark against {base_url} (AI latency {args.ai_latency}s)")
+    print(f"{'script':<10} {'files':>5} {'wall s':>8} {'API':>5} {'writes':>6} {'304':>4} "
+          f"{'AI':>4} {'KB in':>8} {'KB out':>8}")
+
+    try:
+        for name, build_args in scenarios:
+            for size in args.sizes:
+                for run in range(1, args.runs + 1):
+                    state.reset()
+                    elapsed = run_script(build_args(size), env, args.verbose)
+                    row = dict(state.counters, script=name, files=size, run=run, wall_seconds=round(elapsed, 3))
+                    results.append(row)
+                    print(f"{name:<10} {size:>5} {elapsed:>8.2f} {row['api_calls']:>5} {row['api_writes']:>6} "
+                          f"{row['api_not_modified']:>4} {row['ai_calls']:>4} "
+                          f"{row['bytes_in'] / 1024:>8.1f} {row['bytes_out'] / 1024:>8.1f}")
+    finally:
+        server.shutdown()
+        if cache_dir:
+            cache_dir.cleanup()
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.json_output}")
+
+
+if __name__ == '__main__':
+    main()
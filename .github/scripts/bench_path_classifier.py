@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared path classifier
+Measures classification throughput on synthetic paths or a real git range
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+from typing import List
+
+from path_classifier import get_classifier
+
+
+SYNTHETIC_DIRS = [
+    'tasks', 'defaults', 'vars', 'meta', 'templates', 'files', 'docs',
+    'tests', 'molecule/default', 'molecule/tart', '.github/workflows', '.github/scripts/prompts'
+]
+SYNTHETIC_EXTENSIONS = ['.yml', '.yaml', '.j2', '.md', '.py', '.sh', '.service', '']
+
+
+def synthetic_paths(count: int, seed: int = 42) -> List[str]:
+    """Generate role-shaped paths with a realistic mix of depths and extensions"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        directory = rng.choice(SYNTHETIC_DIRS + [''])
+        name = f"file_{i % 997}{rng.choice(SYNTHETIC_EXTENSIONS)}"
+        paths.append(f"{directory}/{name}" if directory else name)
+    return paths
+
+
+def range_paths(rev_range: str) -> List[str]:
+    """Every path touched by every commit in a range, as a release run sees them"""
+    output = subprocess.check_output(
+        ['git', 'log', '--name-only', '--format=', rev_range],
+        text=True
+    )
+    return [line for line in output.splitlines() if line]
+
+
+def legacy_classify(path: str) -> str:
+    """The startswith chain the scripts used before the shared classifier"""
+    if path.startswith('tasks/'):
+        return 'tasks'
+    elif path.startswith('vars/') or path.startswith('defaults/'):
+        return 'vars'
+    elif path.startswith('meta/'):
+        return 'meta'
+    elif path.startswith('tests/') or path.startswith('molecule/'):
+        return 'tests'
+    elif path.endswith('.md') or path.startswith('docs/'):
+        return 'docs'
+    elif path.startswith('.github/'):
+        return 'ci'
+    return 'other'
+
+
+def measure(label: str, func, paths: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+
+    rate = len(paths) / best if best else float('inf')
+    print(f"  {label:<12} {best * 1000:9.1f} ms  {rate:12,.0f} paths/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Path classifier benchmark')
+    parser.add_argument('--paths', type=int, default=100000, help='Number of synthetic paths')
+    parser.add_argument('--range', dest='rev_range', help='Classify the paths of a git range, e.g. v1.0.0..HEAD')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions, best is reported')
+    parser.add_argument('--min-rate', type=float, default=20000,
+                        help='Fail if the classifier is slower than this many paths per second')
+    args = parser.parse_args()
+
+    paths = range_paths(args.rev_range) if args.rev_range else synthetic_paths(args.paths)
+    source = args.rev_range or 'synthetic'
+    print(f"📊 Classifying {len(paths):,} paths ({source}), best of {args.repeat}")
+
+    classifier = get_classifier()
+    rate = measure('classifier', classifier.classify, paths, args.repeat)
+    measure('legacy', legacy_classify, paths, args.repeat)
+
+    start = time.perf_counter()
+    classifier.categorize(paths)
+    print(f"  categorize   {(time.perf_counter() - start) * 1000:9.1f} ms  (grouping + dedup)")
+
+    if rate < args.min_rate:
+        print(f"❌ Classifier throughput below {args.min_rate:,.0f} paths/s")
+        sys.exit(1)
+    print("✅ Classifier throughput OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Structured changelog store
+One JSON record per release, oldest first, in .github/changelog.jsonl.
+CHANGELOG.md is rendered from it; adding a release appends one record and
+splices one section and one compare link into the Markdown. Each record names
+the release its compare link starts from, the highest version below it.
+"""
+
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import semver
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+DEFAULT_STORE_PATH = os.path.join('.github', 'changelog.jsonl')
+REPO_URL = "https://github.com/oatakan/ansible-role-rhel_template_build"
+
+CHANGELOG_PREAMBLE = """# Changelog
+
+All notable changes to this project will be documented in this file.
+
+The format is based on [Keep a Changelog](https://keepachangelog.com/en/1.0.0/),
+and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0.html).
+"""
+
+RELEASE_HEADING_PATTERN = re.compile(r'^## \[(v[^\]]+)\](?: - (\S+))?\s*$')
+LINK_PATTERN = re.compile(r'^\[[^\]]+\]: ')
+COMPARE_LINK_PATTERN = re.compile(r'^\[(v[^\]]+)\]: \S+/compare/(\S+)\.\.\.\1\s*$')
+
+# Records are short, so the tail of the file always holds the last few
+TAIL_BYTES = 64 * 1024
+
+
+class ChangelogStore:
+    """Append-only JSON Lines file of release records"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def records(self) -> Iterator[Dict]:
+        """Every release record, oldest first"""
+        if not self.exists():
+            return
+        with open(self.path, 'r') as f:
+            yield from self.parse_lines(f)
+
+    @staticmethod
+    def parse_lines(lines: Iterable[str]) -> Iterator[Dict]:
+        if isinstance(lines, str):
+            lines = lines.split('\n')
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+    def recent(self, count: int = 1) -> List[Dict]:
+        """The newest records, newest first, read from the end of the file"""
+        if not self.exists() or count <= 0:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - TAIL_BYTES))
+            lines = [line for line in f.read().split(b'\n') if line.strip()]
+
+        # The first line of a partial read may be cut off
+        if size > TAIL_BYTES:
+            lines = lines[1:]
+            if len(lines) < count:
+                return list(self.records())[::-1][:count]
+
+        return [json.loads(line) for line in reversed(lines[-count:])]
+
+    def find(self, version: str) -> Optional[Dict]:
+        """Record of one version anywhere in the history, the newest if it repeats"""
+        found = None
+        for record in self.records():
+            if record['version'] == version:
+                found = record
+        return found
+
+    def previous(self, version: str) -> Optional[Dict]:
+        """Recorded release a new version's compare link starts from"""
+        return previous_release(self.records(), version)
+
+    @staticmethod
+    def serialize(record: Dict) -> str:
+        return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def version_key(version: str) -> Optional[semver.Version]:
+    """Semantic version of a tag like v1.2.3, None if it is not one"""
+    try:
+        return semver.Version.parse(version.lstrip('v'))
+    except ValueError:
+        return None
+
+
+def previous_release(records: Iterable[Dict], version: str) -> Optional[Dict]:
+    """Record with the highest version below `version`, whatever the file order"""
+    target = version_key(version)
+    best, best_key = None, None
+    if target is None:
+        return None
+    for record in records:
+        key = version_key(record['version'])
+        if key is not None and key < target and (best_key is None or key > best_key):
+            best, best_key = record, key
+    return best
+
+
+def link_previous(record: Dict, records: List[Dict]) -> Optional[Dict]:
+    """Release a record's compare link starts from, as stored or by version order"""
+    if 'previous' in record:
+        return {'version': record['previous']} if record['previous'] else None
+    return previous_release(records, record['version'])
+
+
+def format_recent_entries(records: List[Dict]) -> str:
+    """Past entries as prompt context"""
+    if not records:
+        return "No previous releases recorded"
+    return "\n\n".join(f"{record['version']} ({record['date']}):\n{record['entry']}" for record in records)
+
+
+def render_section(record: Dict) -> str:
+    """Markdown section of one release"""
+    return f"## [{record['version']}] - {record['date']}\n\n{record['entry'].strip()}\n"
+
+
+def compare_link(record: Dict, previous: Optional[Dict]) -> str:
+    """Link table line of one release"""
+    if previous:
+        return f"[{record['version']}]: {REPO_URL}/compare/{previous['version']}...{record['version']}"
+    return f"[{record['version']}]: {REPO_URL}/releases/tag/{record['version']}"
+
+
+def unreleased_link(latest: Optional[Dict]) -> str:
+    if latest:
+        return f"[Unreleased]: {REPO_URL}/compare/{latest['version']}...HEAD"
+    return f"[Unreleased]: {REPO_URL}/commits/HEAD"
+
+
+def render_changelog(records: List[Dict], unreleased: str = '') -> str:
+    """Full CHANGELOG.md from the records and the hand-written Unreleased section"""
+    parts = [CHANGELOG_PREAMBLE,
+             f"## [Unreleased]\n\n{unreleased.strip()}\n" if unreleased.strip() else "## [Unreleased]\n"]
+    parts.extend(render_section(record) for record in reversed(records))
+
+    links = [unreleased_link(records[-1] if records else None)]
+    links.extend(compare_link(record, link_previous(record, records)) for record in records)
+    parts.append('\n'.join(links) + '\n')
+    return '\n'.join(parts)
+
+
+def add_release_section(content: Optional[str], record: Dict, previous: Optional[Dict]) -> str:
+    """Splice one release into rendered Markdown without re-parsing the history
+
+    The section goes above the newest release heading, the compare link is
+    appended to the link table and the [Unreleased] link moves forward.
+    """
+    if content is None:
+        return render_changelog([record])
+
+    lines = content.rstrip('\n').split('\n')
+
+    # The newest release heading sits right after the Unreleased section
+    insert_at = None
+    for number, line in enumerate(lines):
+        if RELEASE_HEADING_PATTERN.match(line):
+            insert_at = number
+            break
+        if LINK_PATTERN.match(line):
+            break
+
+    # The link table is at the end; walk back to the Unreleased link
+    unreleased_at = None
+    links_start = len(lines)
+    for number in range(len(lines) - 1, -1, -1):
+        if not LINK_PATTERN.match(lines[number]):
+            if lines[number].strip():
+                break
+            continue
+        links_start = number
+        if lines[number].startswith('[Unreleased]:'):
+            unreleased_at = number
+
+    section = render_section(record).rstrip('\n').split('\n') + ['']
+    if unreleased_at is not None:
+        lines[unreleased_at] = unreleased_link(record)
+        lines.append(compare_link(record, previous))
+    else:
+        if links_start == len(lines):
+            lines.append('')
+        lines.extend([unreleased_link(record), compare_link(record, previous)])
+
+    if insert_at is None:
+        insert_at = links_start
+        if lines[insert_at - 1].strip():
+            section = [''] + section
+    lines[insert_at:insert_at] = section
+
+    return '\n'.join(lines) + '\n'
+
+
+def parse_changelog(content: str) -> Dict:
+    """Split an existing CHANGELOG.md into the Unreleased text and release records, oldest first"""
+    unreleased: List[str] = []
+    records: List[Dict] = []
+    previous: Dict[str, Optional[str]] = {}
+    current: Optional[List[str]] = None
+
+    for line in content.split('\n'):
+        if LINK_PATTERN.match(line):
+            link = COMPARE_LINK_PATTERN.match(line)
+            if link:
+                previous[link.group(1)] = link.group(2)
+            elif '/releases/tag/' in line:
+                previous[line[1:line.index(']')]] = None
+            continue
+        match = RELEASE_HEADING_PATTERN.match(line)
+        if match:
+            current = []
+            records.append({'version': match.group(1), 'date': match.group(2) or '', 'entry': current})
+        elif line.startswith('## [Unreleased]'):
+            current = unreleased
+        elif current is not None:
+            current.append(line)
+
+    for record in records:
+        record['entry'] = '\n'.join(record['entry']).strip()
+        if record['version'] in previous:
+            record['previous'] = previous[record['version']]
+
+    return {'unreleased': '\n'.join(unreleased).strip(), 'records': records[::-1]}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Compiled commit message classification for release analysis
+Reproduces the original substring keyword rules, or parses Conventional Commit
+headers and matches whole-word keywords in one regex pass per message
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import yaml
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+
+# Highest priority first; a message gets the first category any keyword hits
+CATEGORIES = ['breaking', 'feature', 'fix']
+
+# The substring lists rule_based_analysis has always used, matched anywhere
+# in the lowercased message. 'compatible' mode reproduces them exactly.
+COMPATIBLE_KEYWORDS = {
+    'breaking': ['breaking', 'remove', 'drop support', '!:'],
+    'feature': ['feat:', 'feature', 'add support', 'new'],
+    'fix': ['fix:', 'bug', 'repair', 'correct'],
+}
+
+# Whole words matched in the subject of messages without a Conventional Commit header
+STRICT_KEYWORDS = {
+    'breaking': ['breaking change', 'breaking changes', 'drop support', 'drops support', 'dropped support',
+                 'remove support', 'removes support', 'removed support'],
+    'feature': ['add support', 'adds support', 'added support', 'feature', 'features', 'new feature',
+                'new features', 'implement', 'implements', 'implemented'],
+    'fix': ['fix', 'fixes', 'fixed', 'bug', 'bugs', 'bugfix', 'bugfixes', 'repair', 'repairs', 'repaired',
+            'correct', 'corrects', 'corrected'],
+}
+
+# Conventional Commit types and the category each one implies
+CONVENTIONAL_TYPES = {
+    'feat': 'feature', 'fix': 'fix',
+    'build': 'other', 'chore': 'other', 'ci': 'other', 'docs': 'other', 'perf': 'other',
+    'refactor': 'other', 'revert': 'other', 'style': 'other', 'test': 'other',
+}
+
+HEADER_PATTERN = re.compile(r'(?P<type>[a-z]+)(?:\((?P<scope>[^()]*)\))?(?P<bang>!)?: ?(?P<description>.*)')
+BREAKING_FOOTER_PATTERN = re.compile(r'^BREAKING[ -]CHANGE: ', re.MULTILINE)
+
+
+class CommitClassifier:
+    """Assigns breaking / feature / fix / other to commit messages"""
+
+    def __init__(self, mode: str = 'compatible'):
+        if mode not in ('strict', 'compatible'):
+            raise ValueError(f"Unknown commit classification mode '{mode}'")
+        self.mode = mode
+        self.version = f"2-{mode}"
+
+        # Plain substring tests beat any regex for the few compatible keywords
+        self._substrings = [(category, tuple(COMPATIBLE_KEYWORDS[category])) for category in CATEGORIES]
+
+        self._ranks = {word: rank for rank, category in enumerate(CATEGORIES) for word in STRICT_KEYWORDS[category]}
+
+        # Every keyword in one alternation, longest first so the full phrase wins
+        alternation = '|'.join(re.escape(word) for word in sorted(self._ranks, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b(?:{alternation})\b")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'CommitClassifier':
+        """Build from the commit_classification section of the AI config"""
+        section = (config or {}).get('commit_classification') or {}
+        return cls(section.get('mode', 'compatible'))
+
+    def _substring_category(self, text: str) -> str:
+        text = text.lower()
+        for category, words in self._substrings:
+            for word in words:
+                if word in text:
+                    return category
+        return 'other'
+
+    def _keyword_category(self, text: str) -> str:
+        ranks = self._ranks
+        best = len(CATEGORIES)
+        for word in self._pattern.findall(text.lower()):
+            rank = ranks[word]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return CATEGORIES[best] if best < len(CATEGORIES) else 'other'
+
+    def classify(self, message: str) -> Dict:
+        """Classify one commit message"""
+        if self.mode == 'compatible':
+            category = self._substring_category(message)
+            return {'category': category, 'breaking': category == 'breaking', 'type': '', 'scope': ''}
+
+        result = {'category': 'other', 'breaking': False, 'type': '', 'scope': ''}
+        subject = message.partition('\n')[0].strip()
+        header = HEADER_PATTERN.fullmatch(subject)
+        if header and header.group('type') not in CONVENTIONAL_TYPES:
+            header = None
+        if header:
+            result['type'] = header.group('type')
+            result['scope'] = header.group('scope') or ''
+
+        if (header and header.group('bang')) or ('BREAKING' in message and BREAKING_FOOTER_PATTERN.search(message)):
+            result['category'] = 'breaking'
+        elif header:
+            result['category'] = CONVENTIONAL_TYPES[result['type']]
+        else:
+            # Free-form messages are judged on their subject line only
+            result['category'] = self._keyword_category(subject)
+
+        result['breaking'] = result['category'] == 'breaking'
+        return result
+
+    def classify_batch(self, messages: Iterable[str]) -> List[Dict]:
+        """Classify many messages with the compiled patterns"""
+        classify = self.classify
+        return [classify(message) for message in messages]
+
+
+_classifier: Optional[CommitClassifier] = None
+
+
+def get_commit_classifier(config_path: Optional[str] = None) -> CommitClassifier:
+    """Load the shared commit classifier from ai_config.yml once per process"""
+    global _classifier
+    if _classifier is None:
+        config_file = Path(config_path) if config_path else Path(__file__).parent / "ai_config.yml"
+        try:
+            with open(config_file, 'r') as f:
+                config = yaml.safe_load(f)
+        except Exception as e:
+            print(f"Warning: Could not load commit classification config: {e}")
+            config = None
+        _classifier = CommitClassifier.from_config(config)
+    return _classifier
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Persistent AI response cache for the documentation updater
+Remembers the reply to each per-variable documentation prompt, so a repeated
+post-release run only asks the AI about blocks whose input changed
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+# Responses kept for the most recent prompts only
+MAX_ENTRIES = 200
+
+
+class DocCache:
+    """JSON store of AI responses keyed on the rendered prompt input"""
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.responses: Dict[str, str] = {}
+        self.hits = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> 'DocCache':
+        """Use DOC_CACHE_FILE, or .git/ai-doc-cache.json in the working tree"""
+        return cls(os.environ.get('DOC_CACHE_FILE') or os.path.join('.git', 'ai-doc-cache.json'))
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable documentation cache: {e}")
+            return
+
+        if isinstance(data, dict):
+            self.responses = {key: value for key, value in data.items() if isinstance(value, str)}
+        print(f"✓ Documentation cache loaded: {len(self.responses)} AI responses")
+
+    @staticmethod
+    def make_key(task_name: str, template_variables: Dict[str, Any]) -> str:
+        """Key responses on the prompt and everything rendered into it"""
+        payload = json.dumps([task_name, template_variables], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def call_ai(self, ai_client, task_name: str, template_variables: Dict[str, Any]) -> Optional[str]:
+        """Call the AI, reusing the response from an earlier run over the same input"""
+        key = self.make_key(task_name, template_variables)
+        with self._lock:
+            content = self.responses.get(key)
+            if content is not None:
+                self.hits += 1
+                print(f"♻️  Reusing cached {task_name} response")
+                return content
+
+        result = ai_client.call_ai(task_name, template_variables)
+        if result['content']:
+            with self._lock:
+                self.responses.pop(key, None)
+                self.responses[key] = result['content']
+                while len(self.responses) > self.max_entries:
+                    self.responses.pop(next(iter(self.responses)))
+                self._dirty = True
+        return result['content']
+
+    def save(self):
+        """Write the cached responses if this run added any"""
+        if self.hits:
+            print(f"🗄️  Documentation cache: {self.hits} AI responses reused")
+        if not self._dirty:
+            return
+
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(self.responses, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write documentation cache: {e}")
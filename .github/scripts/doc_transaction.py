@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+In-memory document transactions for release-time edits
+Each file is read once, every edit is applied in memory, and only files that
+actually changed are written back with an atomic rename or shown as a diff.
+Append-only files are extended in place without being read.
+"""
+
+import difflib
+import os
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+
+class DocumentTransaction:
+    """A set of text files edited together and committed in one pass"""
+
+    def __init__(self, root: str = '.'):
+        self.root = root
+        self._original: Dict[str, Optional[str]] = {}
+        self._current: Dict[str, Optional[str]] = {}
+        self._appends: Dict[str, List[str]] = {}
+
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.root, path)
+
+    def exists(self, path: str) -> bool:
+        return self.get(path) is not None
+
+    def get(self, path: str) -> Optional[str]:
+        """Current content of a file, loading it on first use (None if missing)"""
+        if path not in self._current:
+            try:
+                with open(self._full_path(path), 'r') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                content = None
+            self._original[path] = content
+            self._current[path] = content
+            pending = self._appends.pop(path, None)
+            if pending:
+                self._current[path] = (content or '') + ''.join(pending)
+        return self._current[path]
+
+    def set(self, path: str, content: str):
+        """Replace the content of a file in memory"""
+        self.get(path)
+        self._current[path] = content
+
+    def append(self, path: str, text: str):
+        """Append text to a file at commit time without reading it"""
+        if path in self._current:
+            self.set(path, (self._current[path] or '') + text)
+        else:
+            self._appends.setdefault(path, []).append(text)
+
+    def edit(self, path: str, func: Callable[[str], str]) -> bool:
+        """Apply an edit to an existing file, returning whether it changed anything"""
+        content = self.get(path)
+        if content is None:
+            return False
+        updated = func(content)
+        self._current[path] = updated
+        return updated != content
+
+    def changed_files(self) -> List[str]:
+        changed = [path for path, content in self._current.items()
+                   if content is not None and content != self._original[path]]
+        return changed + list(self._appends)
+
+    def diff(self) -> str:
+        """Unified diff of every pending change"""
+        chunks = []
+        for path, pending in self._appends.items():
+            chunks.append(f"--- a/{path}\n+++ b/{path}\n@@ appended @@\n")
+            chunks.extend(f"+{line}\n" for line in ''.join(pending).splitlines())
+        for path in self.changed_files():
+            if path in self._appends:
+                continue
+            chunks.extend(difflib.unified_diff(
+                (self._original[path] or '').splitlines(keepends=True),
+                self._current[path].splitlines(keepends=True),
+                fromfile=f"a/{path}" if self._original[path] is not None else '/dev/null',
+                tofile=f"b/{path}"
+            ))
+        return ''.join(chunks)
+
+    def _write_atomic(self, path: str, content: str):
+        full_path = self._full_path(path)
+        directory = os.path.dirname(full_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            if os.path.exists(full_path):
+                os.chmod(tmp_path, os.stat(full_path).st_mode & 0o7777)
+            else:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _append_file(self, path: str, text: str):
+        full_path = self._full_path(path)
+        os.makedirs(os.path.dirname(full_path) or '.', exist_ok=True)
+        with open(full_path, 'a') as f:
+            f.write(text)
+
+    def commit(self, show_diff: bool = False) -> List[str]:
+        """Write changed files, or print their diff instead, and return their paths"""
+        changed = self.changed_files()
+
+        if show_diff:
+            print(self.diff() or "ℹ️  No document changes")
+            return changed
+
+        for path in changed:
+            if path in self._appends:
+                self._append_file(path, ''.join(self._appends.pop(path)))
+                continue
+            self._write_atomic(path, self._current[path])
+            self._original[path] = self._current[path]
+
+        if changed:
+            print(f"✅ Wrote {', '.join(changed)}")
+        else:
+            print("ℹ️  No document changes to write")
+        return changed
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP cache for GitHub API reads
+Revalidates cached responses with ETag / Last-Modified conditional requests
+and makes PyGithub connections safe to share between threads
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    from github import Github
+    from github.Requester import (
+        HTTPRequestsConnectionClass,
+        HTTPSRequestsConnectionClass,
+        Requester,
+        RequestsResponse,
+    )
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+
+# Headers that describe the transfer rather than the cached body
+_TRANSFER_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class GitHubHTTPCache:
+    """Disk-backed store of GET responses, evicted least-recently-used by size"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.stats = {
+            'revalidated': 0,
+            'fetched': 0,
+            'stored': 0,
+            'bytes_saved': 0
+        }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    @staticmethod
+    def make_key(url: str, headers: Dict[str, str]) -> str:
+        """Key entries on the URL and the representation requested"""
+        accept = headers.get('Accept', '')
+        return hashlib.sha256(f"{url}\n{accept}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load an entry and mark it as recently used"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, url: str, response: requests.Response):
+        """Store a 200 response that carries a validator"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _TRANSFER_HEADERS},
+            'body': response.text
+        }
+
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self.stats['stored'] += 1
+        except OSError as e:
+            print(f"Warning: Could not write GitHub cache entry: {e}")
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Build the validator headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def build_response(self, entry: Dict[str, Any], not_modified: requests.Response) -> requests.Response:
+        """Turn a 304 into the cached 200, keeping the fresh rate limit headers"""
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        for name, value in not_modified.headers.items():
+            if name.lower().startswith('x-ratelimit'):
+                response.headers[name] = value
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = entry['url']
+        response.request = not_modified.request
+
+        self.stats['bytes_saved'] += len(response._content)
+        return response
+
+    def prune(self):
+        """Evict least-recently-used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def log_summary(self):
+        """Print cache effectiveness for the run"""
+        if self.stats['revalidated'] or self.stats['fetched']:
+            print(f"🗄️  GitHub cache: {self.stats['revalidated']} not modified, "
+                  f"{self.stats['fetched']} fetched, "
+                  f"{self.stats['bytes_saved'] // 1024} KB not re-downloaded")
+
+
+def _thread_local_attribute(name: str) -> property:
+    """Store a per-request connection attribute separately for each thread"""
+
+    def getter(self):
+        return getattr(self._request_state, name)
+
+    def setter(self, value):
+        setattr(self._request_state, name, value)
+
+    return property(getter, setter)
+
+
+class _CachingConnectionMixin:
+    """Connection class that revalidates GET requests against the cache"""
+
+    cache: Optional[GitHubHTTPCache] = None
+    _shared_session: Optional[requests.Session] = None
+
+    # PyGithub may hand the same connection to several threads, and it keeps
+    # the pending request on the connection between request() and getresponse()
+    verb = _thread_local_attribute('verb')
+    url = _thread_local_attribute('url')
+    input = _thread_local_attribute('input')
+    headers = _thread_local_attribute('headers')
+    stream = _thread_local_attribute('stream')
+
+    def __init__(self, *args, **kwargs):
+        self._request_state = threading.local()
+        super().__init__(*args, **kwargs)
+
+        # Injected connection classes are re-created for every request,
+        # so share one session to keep the connection pool alive
+        cls = type(self)
+        if cls._shared_session is None:
+            cls._shared_session = self.session
+        else:
+            self.session.close()
+            self.session = cls._shared_session
+
+    def getresponse(self) -> RequestsResponse:
+        if self.cache is None or self.verb.upper() != 'GET' or self.stream:
+            return super().getresponse()
+
+        url = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+        key = self.cache.make_key(url, self.headers)
+        entry = self.cache.get(key)
+
+        headers = dict(self.headers)
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+
+        r = self.session.get(
+            url,
+            headers=headers,
+            timeout=self.timeout,
+            verify=self.verify,
+            allow_redirects=False,
+        )
+
+        if r.status_code == 304 and entry:
+            self.cache.stats['revalidated'] += 1
+            r = self.cache.build_response(entry, r)
+        else:
+            self.cache.stats['fetched'] += 1
+            if r.status_code == 200:
+                self.cache.store(key, url, r)
+
+        return RequestsResponse(r)
+
+    def close(self):
+        # The session is shared between connections
+        pass
+
+
+class CachingHTTPSConnection(_CachingConnectionMixin, HTTPSRequestsConnectionClass):
+    pass
+
+
+class CachingHTTPConnection(_CachingConnectionMixin, HTTPRequestsConnectionClass):
+    pass
+
+
+def install_connection_classes():
+    """Route all PyGithub requests through the shared, thread-safe connections"""
+    Requester.injectConnectionClasses(CachingHTTPConnection, CachingHTTPSConnection)
+
+
+def install_http_cache(cache_dir: str, max_bytes: int = 50 * 1024 * 1024) -> GitHubHTTPCache:
+    """Route all PyGithub requests through the disk cache"""
+    cache = GitHubHTTPCache(cache_dir, max_bytes)
+    cache.prune()
+
+    _CachingConnectionMixin.cache = cache
+    install_connection_classes()
+
+    atexit.register(cache.prune)
+    atexit.register(cache.log_summary)
+    print(f"✓ GitHub HTTP cache enabled: {cache_dir}")
+    return cache
+
+
+def create_github_client(token: Optional[str]) -> Github:
+    """Create the GitHub client, enabling the HTTP cache when configured"""
+    cache_dir = os.environ.get('GITHUB_HTTP_CACHE_DIR')
+    if cache_dir:
+        max_mb = int(os.environ.get('GITHUB_HTTP_CACHE_MAX_MB', '50'))
+        install_http_cache(cache_dir, max_mb * 1024 * 1024)
+    else:
+        install_connection_classes()
+
+    # Set by Actions, also lets GHES and local stand-ins be targeted
+    base_url = os.environ.get('GITHUB_API_URL')
+    if base_url:
+        return Github(token, base_url=base_url)
+    return Github(token)
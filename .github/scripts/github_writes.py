@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Batched GitHub write plans
+Collects the writes a script wants to make, then prints them as a dry run or
+executes independent writes concurrently with secondary rate limit retries
+"""
+
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from github import GithubException, RateLimitExceededException
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+
+def is_secondary_rate_limit(error: Exception) -> bool:
+    """Check whether GitHub rejected a request for hitting a rate limit"""
+    if isinstance(error, RateLimitExceededException):
+        return True
+
+    if isinstance(error, GithubException) and error.status in (403, 429):
+        message = json.dumps(error.data).lower() if error.data else ''
+        return 'secondary rate limit' in message or 'abuse' in message
+
+    return False
+
+
+class WritePlan:
+    """An ordered set of independent GitHub writes"""
+
+    def __init__(self, max_workers: int = 4, max_retries: int = 3, retry_delay: float = 5):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.operations: List[Dict[str, Any]] = []
+
+    def add(self, name: str, description: str, action: Callable[..., Any], *args,
+            payload: Optional[Any] = None, success_message: Optional[str] = None, **kwargs):
+        """Queue a write; payload is what the dry run shows for it"""
+        self.operations.append({
+            'name': name,
+            'description': description,
+            'action': action,
+            'args': args,
+            'kwargs': kwargs,
+            'payload': payload,
+            'success_message': f"✅ {description}" if success_message is None else success_message
+        })
+
+    def is_empty(self) -> bool:
+        return not self.operations
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        """Serializable view of the plan"""
+        return [
+            {
+                'name': op['name'],
+                'description': op['description'],
+                'payload': op['payload']
+            }
+            for op in self.operations
+        ]
+
+    def print_dry_run(self):
+        """Print the plan instead of executing it"""
+        print(f"📝 Dry run: {len(self.operations)} planned GitHub writes")
+        print(json.dumps(self.to_dict(), indent=2, default=str))
+
+    def _retry_delay_for(self, error: Exception, attempt: int) -> float:
+        """Honor Retry-After when GitHub sends it, otherwise back off exponentially"""
+        headers = getattr(error, 'headers', None) or {}
+        retry_after = headers.get('retry-after') or headers.get('Retry-After')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(self.retry_delay * (2 ** attempt), 60)
+
+    def _run(self, op: Dict[str, Any]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                op['action'](*op['args'], **op['kwargs'])
+                if op['success_message']:
+                    print(op['success_message'])
+                return True
+            except Exception as e:
+                if is_secondary_rate_limit(e) and attempt < self.max_retries:
+                    delay = self._retry_delay_for(e, attempt)
+                    print(f"⏳ Rate limited on '{op['name']}', retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                    continue
+                print(f"Warning: Could not {op['description'][0].lower()}{op['description'][1:]}: {e}")
+                return False
+        return False
+
+    def execute(self) -> Dict[str, bool]:
+        """Run all writes concurrently, returning success per operation name"""
+        if not self.operations:
+            return {}
+
+        workers = min(self.max_workers, len(self.operations))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self._run, self.operations))
+
+        return {op['name']: ok for op, ok in zip(self.operations, results)}
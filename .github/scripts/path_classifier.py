@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shared path classification for the automation scripts
+Builds the category and risk rules from ai_config.yml into a lookup index once
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+
+RISK_WEIGHTS = {'low': 1, 'medium': 2, 'high': 3}
+
+# Used when ai_config.yml has no path_classification section.
+# Rules are ordered, the first matching rule wins.
+DEFAULT_RULES = [
+    {'category': 'tasks', 'paths': ['tasks/main.yml'], 'risk': 'medium'},
+    {'category': 'meta', 'paths': ['meta/main.yml'], 'risk': 'medium'},
+    {'category': 'tasks', 'prefixes': ['tasks/'], 'risk': 'low'},
+    {'category': 'vars', 'prefixes': ['defaults/'], 'risk': 'high'},
+    {'category': 'vars', 'prefixes': ['vars/'], 'risk': 'low'},
+    {'category': 'meta', 'prefixes': ['meta/'], 'risk': 'low'},
+    {'category': 'tests', 'prefixes': ['tests/', 'molecule/'], 'risk': 'low'},
+    {'category': 'docs', 'extensions': ['.md'], 'prefixes': ['docs/'], 'risk': 'low'},
+    {'category': 'ci', 'prefixes': ['.github/'], 'risk': 'low'},
+]
+
+
+class PathClassifier:
+    """Assigns a category and risk level to repository paths"""
+
+    def __init__(self, rules: List[Dict], default_category: str = 'other', default_risk: str = 'low'):
+        self.default = (default_category, default_risk)
+        self.categories = list(dict.fromkeys([rule['category'] for rule in rules] + [default_category]))
+
+        # Each index maps to the position of the rule, so the earliest rule wins
+        self._exact: Dict[str, int] = {}
+        self._extensions: Dict[str, int] = {}
+        self._trie: Dict[str, Dict] = {}
+        self._results: List[Tuple[str, str]] = []
+
+        for position, rule in enumerate(rules):
+            result = (rule['category'], rule.get('risk', default_risk))
+            if result[1] not in RISK_WEIGHTS:
+                raise ValueError(f"Unknown risk level '{result[1]}' for category {rule['category']}")
+            self._results.append(result)
+
+            for path in rule.get('paths', []):
+                self._exact.setdefault(path, position)
+            for extension in rule.get('extensions', []):
+                self._extensions.setdefault(extension.lower(), position)
+            for prefix in rule.get('prefixes', []):
+                node = self._trie
+                for part in prefix.strip('/').split('/'):
+                    node = node.setdefault(part, {})
+                node.setdefault(None, position)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'PathClassifier':
+        """Build from the path_classification section of the AI config"""
+        section = (config or {}).get('path_classification') or {}
+        return cls(
+            section.get('rules') or DEFAULT_RULES,
+            section.get('default_category', 'other'),
+            section.get('default_risk', 'low')
+        )
+
+    def _match(self, path: str) -> Optional[int]:
+        best = self._exact.get(path)
+
+        # Walk the directory components only; the file name is not a prefix
+        node = self._trie
+        parts = path.split('/')
+        for part in parts[:-1]:
+            node = node.get(part)
+            if node is None:
+                break
+            position = node.get(None)
+            if position is not None and (best is None or position < best):
+                best = position
+
+        dot = parts[-1].rfind('.')
+        if dot > 0:
+            position = self._extensions.get(parts[-1][dot:].lower())
+            if position is not None and (best is None or position < best):
+                best = position
+
+        return best
+
+    def classify(self, path: str) -> Tuple[str, str]:
+        """Return (category, risk) for a path"""
+        position = self._match(path)
+        return self.default if position is None else self._results[position]
+
+    def categorize(self, paths: Iterable[str]) -> Dict[str, List[str]]:
+        """Group unique paths by category, keeping first-seen order"""
+        grouped: Dict[str, Dict[str, None]] = {category: {} for category in self.categories}
+        for path in paths:
+            if path:
+                grouped[self.classify(path)[0]][path] = None
+        return {category: list(files) for category, files in grouped.items()}
+
+    def risk_level(self, paths: Iterable[str]) -> str:
+        """Highest risk among the paths"""
+        weight = RISK_WEIGHTS['low']
+        for path in paths:
+            weight = max(weight, RISK_WEIGHTS[self.classify(path)[1]])
+            if weight == RISK_WEIGHTS['high']:
+                break
+        return next(level for level, value in RISK_WEIGHTS.items() if value == weight)
+
+
+_classifier: Optional[PathClassifier] = None
+
+
+def get_classifier(config_path: Optional[str] = None) -> PathClassifier:
+    """Load the shared classifier from ai_config.yml once per process"""
+    global _classifier
+    if _classifier is None:
+        config_file = Path(config_path) if config_path else Path(__file__).parent / "ai_config.yml"
+        try:
+            with open(config_file, 'r') as f:
+                config = yaml.safe_load(f)
+        except Exception as e:
+            print(f"Warning: Could not load path classification config: {e}")
+            config = None
+        _classifier = PathClassifier.from_config(config)
+    return _classifier
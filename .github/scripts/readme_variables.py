@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Block index for the README "Role Variables" section
+Maps each documented variable to the table row or list item that describes it,
+so single blocks can be rewritten and spliced back without touching the rest
+"""
+
+import re
+from typing import Dict, List, Optional
+
+VARIABLE_PATTERN = re.compile(r'`([A-Za-z_][A-Za-z0-9_]*)`')
+
+DEFAULT_TABLE_HEADER = [
+    '| Variable | Default | Description |',
+    '|----------|---------|-------------|',
+]
+
+
+class VariablesSection:
+    """The Role Variables section of a README, indexed by variable"""
+
+    def __init__(self, content: str, start_marker: str = '## Role Variables'):
+        self.lines = content.split('\n')
+        self.start: Optional[int] = None
+        self.end = len(self.lines)
+
+        for number, line in enumerate(self.lines):
+            if self.start is None:
+                if line.strip() == start_marker:
+                    self.start = number
+            elif line.startswith('## '):
+                self.end = number
+                break
+
+        # variable -> line numbers of the blocks that mention it
+        self.blocks: Dict[str, List[int]] = {}
+        self.table_header: List[str] = []
+        self.table_end: Optional[int] = None
+
+        if self.start is None:
+            return
+
+        table_done = False
+        for number in range(self.start + 1, self.end):
+            line = self.lines[number]
+            stripped = line.lstrip()
+            is_row = stripped.startswith('|')
+
+            # Rows of the first table; its header and separator carry no variables
+            if is_row and not table_done:
+                self.table_end = number
+                if len(self.table_header) < 2:
+                    self.table_header.append(line)
+                    continue
+            elif self.table_end is not None:
+                table_done = True
+
+            if is_row or stripped.startswith(('- ', '* ')):
+                for name in VARIABLE_PATTERN.findall(line):
+                    self.blocks.setdefault(name, [])
+                    if number not in self.blocks[name]:
+                        self.blocks[name].append(number)
+
+        # New rows go after the first table, or close the section if it has none
+        self.insert_after = self.table_end
+        if self.insert_after is None:
+            self.insert_after = self.end - 1
+            while self.insert_after > self.start and not self.lines[self.insert_after].strip():
+                self.insert_after -= 1
+
+    @property
+    def found(self) -> bool:
+        return self.start is not None
+
+    def block_variables(self, number: int) -> List[str]:
+        """Variables mentioned by the block on a line"""
+        return list(dict.fromkeys(VARIABLE_PATTERN.findall(self.lines[number])))
+
+    def splice(self, replacements: Dict[int, List[str]], additions: List[str]) -> str:
+        """Replace blocks (an empty list removes one) and insert new table rows"""
+        if additions and self.table_end is None:
+            additions = [''] + DEFAULT_TABLE_HEADER + additions
+
+        lines = []
+        for number, line in enumerate(self.lines):
+            lines.extend(replacements.get(number, [line]))
+            if number == self.insert_after:
+                lines.extend(additions)
+
+        return '\n'.join(lines)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Persistent classification cache for the release analyzer
+Remembers each commit's classification by SHA and the AI responses for a
+release range, so re-runs only classify commits they have not seen before
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import git
+except ImportError as e:
+    print(f"Error: Missing required package: {e}")
+    sys.exit(1)
+
+
+# AI responses kept for the most recent inputs only
+MAX_AI_ENTRIES = 20
+
+
+class ReleaseCache:
+    """JSON store of commit classifications and AI responses"""
+
+    def __init__(self, path: str, classifier_version: str):
+        self.path = Path(path)
+        self.classifier_version = classifier_version
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.ai_responses: Dict[str, Any] = {}
+        self.stats = {'commit_hits': 0, 'commit_misses': 0, 'ai_hits': 0}
+        self._seen = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_repo(cls, repo: git.Repo, classifier_version: str) -> 'ReleaseCache':
+        """Use RELEASE_CACHE_FILE, or a file inside the repository's git dir"""
+        path = os.environ.get('RELEASE_CACHE_FILE') or os.path.join(repo.git_dir, 'ai-release-cache.json')
+        return cls(path, classifier_version)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable release cache: {e}")
+            return
+
+        # Entries from other classification rules are dropped
+        if data.get('classifier_version') == self.classifier_version:
+            self.commits = data.get('commits', {})
+        self.ai_responses = data.get('ai_responses', {})
+        print(f"✓ Release cache loaded: {len(self.commits)} commits, {len(self.ai_responses)} AI responses")
+
+    def get_commit(self, sha: str) -> Optional[Dict[str, Any]]:
+        """Cached classification of a commit"""
+        entry = self.commits.get(sha)
+        if entry is None:
+            self.stats['commit_misses'] += 1
+        else:
+            self.stats['commit_hits'] += 1
+            self._seen.add(sha)
+        return entry
+
+    def set_commit(self, sha: str, category: str, breaking: bool, summary: str):
+        """Remember how a commit was classified"""
+        self.commits[sha] = {'category': category, 'breaking': breaking, 'summary': summary}
+        self._seen.add(sha)
+        self._dirty = True
+
+    @staticmethod
+    def make_ai_key(task_name: str, template_variables: Dict[str, Any]) -> str:
+        """Key AI responses on the prompt and everything rendered into it"""
+        payload = json.dumps([task_name, template_variables], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_ai_response(self, key: str) -> Optional[Any]:
+        """Cached AI response for a prompt"""
+        with self._lock:
+            if key in self.ai_responses:
+                self.stats['ai_hits'] += 1
+                return self.ai_responses[key]
+        return None
+
+    def set_ai_response(self, key: str, response: Any):
+        """Remember an AI response, evicting the oldest beyond MAX_AI_ENTRIES"""
+        with self._lock:
+            self.ai_responses.pop(key, None)
+            self.ai_responses[key] = response
+            while len(self.ai_responses) > MAX_AI_ENTRIES:
+                self.ai_responses.pop(next(iter(self.ai_responses)))
+            self._dirty = True
+
+    def call_ai(self, ai_client, task_name: str, template_variables: Dict[str, Any],
+                validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """Call the AI, reusing the response from an earlier run over the same input"""
+        key = self.make_ai_key(task_name, template_variables)
+        content = self.get_ai_response(key)
+        if content is not None:
+            print(f"♻️  Reusing cached {task_name} response")
+            return content
+
+        result = ai_client.call_ai(task_name, template_variables)
+        if result['content'] and (validate is None or validate(result['content'])):
+            self.set_ai_response(key, result['content'])
+        return result['content']
+
+    def save(self):
+        """Write the commits seen in this run and the recent AI responses"""
+        if not self._dirty and len(self._seen) == len(self.commits):
+            return
+
+        data = {
+            'classifier_version': self.classifier_version,
+            # Commits outside the current range will not be analyzed again
+            'commits': {sha: self.commits[sha] for sha in self._seen if sha in self.commits},
+            'ai_responses': self.ai_responses
+        }
+
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write release cache: {e}")
+
+    def log_summary(self):
+        """Print cache effectiveness for the run"""
+        print(f"🗄️  Release cache: {self.stats['commit_hits']} commits reused, "
+              f"{self.stats['commit_misses']} classified, "
+              f"{self.stats['ai_hits']} AI responses reused")
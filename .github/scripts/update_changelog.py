@@ -1,89 +1,101 @@
 #!/usr/bin/env python3
 """
 Update CHANGELOG.md with new version entry
+Releases are recorded in .github/changelog.jsonl; CHANGELOG.md is rendered from it
 """
 
 import argparse
-import os
 from datetime import datetime
-import re
+import sys
+from typing import Optional
 
+from changelog_store import ChangelogStore, add_release_section, parse_changelog, render_changelog
+from doc_transaction import DocumentTransaction
 
-def update_changelog(version: str, entry: str):
-    """Update CHANGELOG.md with new version entry"""
+CHANGELOG_FILE = 'CHANGELOG.md'
 
-    changelog_path = 'CHANGELOG.md'
 
-    # Read existing changelog
-    if os.path.exists(changelog_path):
-        with open(changelog_path, 'r') as f:
-            content = f.read()
-    else:
-        # Create new changelog
-        content = """# Changelog
+def update_changelog(version: str, entry: str, docs: Optional[DocumentTransaction] = None,
+                     store: Optional[ChangelogStore] = None):
+    """Record a new version and add its section to CHANGELOG.md
 
-All notable changes to this project will be documented in this file.
+    With a transaction the edit is only staged; the caller commits it.
+    """
+    transaction = docs or DocumentTransaction()
+    store = store or ChangelogStore()
 
-The format is based on [Keep a Changelog](https://keepachangelog.com/en/1.0.0/),
-and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0.html).
+    if store.find(f"v{version}"):
+        print(f"ℹ️  Version {version} is already in the changelog")
+        return
 
-## [Unreleased]
-"""
-
-    # Prepare new entry
-    date = datetime.now().strftime('%Y-%m-%d')
-    new_entry = f"\n## [v{version}] - {date}\n\n{entry}\n"
-
-    # Insert after [Unreleased] section
-    pattern = r'(## \[Unreleased\].*?)(?=\n## \[|$)'
-    match = re.search(pattern, content, re.DOTALL)
-
-    if match:
-        # Insert new version after Unreleased
-        end_pos = match.end()
-        updated_content = content[:end_pos] + new_entry + content[end_pos:]
-    else:
-        # Append to end
-        updated_content = content + new_entry
-
-    # Update comparison links at the bottom
-    if '[Unreleased]:' in updated_content:
-        # Update unreleased comparison
-        updated_content = re.sub(
-            r'\[Unreleased\]: (.+)/compare/(.+?)\.\.\.HEAD',
-            f'[Unreleased]: \\1/compare/v{version}...HEAD',
-            updated_content
-        )
-
-        # Add new version comparison
-        repo_url = "https://github.com/oatakan/ansible-role-rhel_template_build"
-        prev_version_match = re.search(r'\[v([\d.]+)\]:', updated_content)
-        if prev_version_match:
-            prev_version = prev_version_match.group(1)
-            new_link = f"[v{version}]: {repo_url}/compare/v{prev_version}...v{version}"
-        else:
-            new_link = f"[v{version}]: {repo_url}/releases/tag/v{version}"
-
-        # Add link before the last line
-        lines = updated_content.strip().split('\n')
-        lines.append(new_link)
-        updated_content = '\n'.join(lines) + '\n'
-
-    # Write updated changelog
-    with open(changelog_path, 'w') as f:
-        f.write(updated_content)
+    previous = store.previous(f"v{version}")
+    record = {
+        'version': f"v{version}",
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'entry': entry.strip(),
+        'previous': previous['version'] if previous else None
+    }
 
+    transaction.append(store.path, store.serialize(record))
+    transaction.set(CHANGELOG_FILE, add_release_section(transaction.get(CHANGELOG_FILE), record, previous))
     print(f"✅ Updated CHANGELOG.md with version {version}")
 
+    if docs is None:
+        transaction.commit()
+
+
+def import_changelog(docs: DocumentTransaction, store: ChangelogStore):
+    """Create the store from an existing CHANGELOG.md"""
+    content = docs.get(CHANGELOG_FILE)
+    if content is None:
+        print(f"Error: {CHANGELOG_FILE} not found")
+        sys.exit(1)
+
+    records = parse_changelog(content)['records']
+    docs.set(store.path, ''.join(store.serialize(record) for record in records))
+    print(f"✅ Imported {len(records)} releases into {store.path}")
+
+
+def render_full_changelog(docs: DocumentTransaction, store: ChangelogStore):
+    """Rebuild CHANGELOG.md from the store, keeping the Unreleased section"""
+    content = docs.get(store.path)
+    records = list(ChangelogStore.parse_lines(content or ''))
+    if not records:
+        print(f"Error: No releases in {store.path}; run with --import first")
+        sys.exit(1)
+    unreleased = parse_changelog(docs.get(CHANGELOG_FILE) or '')['unreleased']
+    docs.set(CHANGELOG_FILE, render_changelog(records, unreleased))
+    print(f"✅ Rendered CHANGELOG.md from {len(records)} releases")
+
 
 def main():
     parser = argparse.ArgumentParser(description='Update CHANGELOG.md')
-    parser.add_argument('--version', required=True, help='Version number (without v prefix)')
-    parser.add_argument('--entry', required=True, help='Changelog entry content')
+    parser.add_argument('--version', help='Version number (without v prefix)')
+    parser.add_argument('--entry', help='Changelog entry content')
+    parser.add_argument('--store', default=None, help='Changelog store (default: .github/changelog.jsonl)')
+    parser.add_argument('--import', dest='import_markdown', action='store_true',
+                        help='Create the store from the existing CHANGELOG.md')
+    parser.add_argument('--render', action='store_true', help='Rebuild CHANGELOG.md from the store')
+    parser.add_argument('--diff', action='store_true', help='Print a unified diff instead of writing')
     args = parser.parse_args()
 
-    update_changelog(args.version, args.entry)
+    if not (args.import_markdown or args.render) and not (args.version and args.entry):
+        parser.error('--version and --entry are required unless --import or --render is given')
+    if args.import_markdown and args.version:
+        parser.error('--import creates the store from CHANGELOG.md and cannot add a version')
+
+    docs = DocumentTransaction()
+    store = ChangelogStore(args.store) if args.store else ChangelogStore()
+
+    if args.import_markdown:
+        import_changelog(docs, store)
+    if args.render:
+        render_full_changelog(docs, store)
+    if args.version and args.entry:
+        update_changelog(args.version, args.entry, docs, store)
+
+    docs.commit(show_diff=args.diff)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
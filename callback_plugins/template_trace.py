@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# MIT License (see LICENSE)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+name: template_trace
+type: aggregate
+short_description: Write structured per-task, per-host execution traces
+description:
+  - Records every task run on every host with its start and end time,
+    status, action, task file and an estimate of the module payload sent
+    to the host.
+  - Writes JSON Lines, one record per host and task as it finishes, or a
+    Chrome trace (chrome://tracing, Perfetto) with one row per host when
+    the playbook ends.
+  - Traces from many template builds can be concatenated or loaded side by
+    side to see where wall time goes across hosts.
+requirements:
+  - enable in configuration (callbacks_enabled) and set a trace path
+options:
+  path:
+    description:
+      - File the trace is written to. Nothing is recorded when empty.
+      - C({pid}) is replaced with the controller process ID, so concurrent
+        builds can share one setting.
+    type: str
+    default: ''
+    env:
+      - name: TEMPLATE_TRACE_FILE
+    ini:
+      - section: callback_template_trace
+        key: path
+  format:
+    description: C(jsonl) for JSON Lines or C(chrome) for the Chrome trace event format.
+    type: str
+    default: jsonl
+    choices: [jsonl, chrome]
+    env:
+      - name: TEMPLATE_TRACE_FORMAT
+    ini:
+      - section: callback_template_trace
+        key: format
+'''
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+from ansible.plugins.loader import module_loader
+
+# Actions that run on the controller and send nothing to the host
+CONTROLLER_ACTIONS = frozenset([
+    'assert', 'debug', 'fail', 'set_fact', 'include_tasks', 'import_tasks',
+    'include_role', 'import_role', 'include_vars', 'meta', 'pause',
+])
+
+
+class CallbackModule(CallbackBase):
+    """Structured execution traces for template builds"""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'template_trace'
+    CALLBACK_NEEDS_ENABLED = True
+    CALLBACK_NEEDS_WHITELIST = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self.path = None
+        self.format = 'jsonl'
+        self.play = ''
+        self.started = {}
+        self.events = []
+        self.hosts = {}
+        self.module_sizes = {}
+        self.output = None
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        path = self.get_option('path')
+        self.format = self.get_option('format')
+        if path:
+            self.path = path.replace('{pid}', str(os.getpid()))
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            if self.format == 'jsonl':
+                self.output = open(self.path, 'a')
+
+    def module_size(self, action):
+        """Size of the module source, the bulk of what is sent to the host"""
+        if action not in self.module_sizes:
+            size = 0
+            try:
+                path = module_loader.find_plugin(action, mod_type='.py')
+                if path and os.path.exists(path):
+                    size = os.path.getsize(path)
+            except Exception:
+                pass
+            self.module_sizes[action] = size
+        return self.module_sizes[action]
+
+    def payload_bytes(self, task):
+        if task.action.rsplit('.', 1)[-1] in CONTROLLER_ACTIONS:
+            return 0
+        try:
+            args = len(json.dumps(task.args, default=str))
+        except (TypeError, ValueError):
+            args = 0
+        return self.module_size(task.action) + args
+
+    def v2_playbook_on_play_start(self, play):
+        self.play = play.get_name()
+
+    def v2_runner_on_start(self, host, task):
+        self.started[(host.get_name(), task._uuid)] = time.time()
+
+    def record(self, result, status):
+        if not self.path:
+            return
+
+        end = time.time()
+        host = result._host.get_name()
+        task = result._task
+        start = self.started.pop((host, task._uuid), end)
+
+        event = {
+            'play': self.play,
+            'task': task.get_name(),
+            'action': task.action,
+            'path': task.get_path(),
+            'role': task._role.get_name() if task._role else None,
+            'host': host,
+            'status': status,
+            'changed': bool(result._result.get('changed', False)),
+            'start': round(start, 6),
+            'end': round(end, 6),
+            'duration': round(end - start, 6),
+            'payload_bytes': self.payload_bytes(task),
+        }
+
+        if self.output:
+            self.output.write(json.dumps(event, sort_keys=True) + '\n')
+            self.output.flush()
+        else:
+            self.events.append(event)
+
+    def v2_runner_on_ok(self, result):
+        self.record(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.record(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self.record(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self.record(result, 'unreachable')
+
+    def chrome_trace(self):
+        """Trace events with one thread (row) per host"""
+        trace = []
+        for event in self.events:
+            tid = self.hosts.setdefault(event['host'], len(self.hosts) + 1)
+            trace.append({
+                'name': event['task'],
+                'cat': event['action'],
+                'ph': 'X',
+                'ts': int(event['start'] * 1000000),
+                'dur': int(event['duration'] * 1000000),
+                'pid': 1,
+                'tid': tid,
+                'args': dict((key, event[key]) for key in ('play', 'path', 'status', 'changed', 'payload_bytes')),
+            })
+        for host, tid in self.hosts.items():
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': host}})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def v2_playbook_on_stats(self, stats):
+        if self.output:
+            self.output.close()
+            self.output = None
+        elif self.path:
+            with open(self.path, 'w') as f:
+                json.dump(self.chrome_trace(), f)
+        if self.path:
+            self._display.display('Execution trace written to %s' % self.path)
@@ -0,0 +1,299 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License (see LICENSE)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: template_free_space
+short_description: Release or zero the free space of a template's disks
+description:
+  - Makes freed blocks reclaimable so exported templates stay small.
+  - Runs fstrim on every mounted local filesystem whose device supports
+    discard, and zero-fills the free space of the others.
+  - Re-creates swap areas zeroed, keeping their UUID and label.
+  - Reports the bytes reclaimed per filesystem and swap area, and supports
+    check mode.
+options:
+  method:
+    description:
+      - C(auto) trims filesystems that support discard and zero-fills the rest.
+      - C(trim) only trims, C(zero) always zero-fills.
+    type: str
+    choices: [auto, trim, zero]
+    default: auto
+  swap:
+    description: Re-create active swap areas zeroed.
+    type: bool
+    default: true
+  fstypes:
+    description: Filesystem types that are trimmed or zero-filled.
+    type: list
+    elements: str
+    default: [xfs, ext4, ext3, ext2]
+  chunk_size:
+    description: Size in MiB of each write when zero-filling.
+    type: int
+    default: 1
+author:
+  - Orcun Atakan (@oatakan)
+'''
+
+EXAMPLES = r'''
+- name: Reclaim free disk space
+  template_free_space:
+    method: auto
+    swap: true
+'''
+
+RETURN = r'''
+filesystems:
+  description: One entry per filesystem that was trimmed or zero-filled.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - {mount: /, device: /dev/mapper/vg00-root, fstype: xfs, method: trim, bytes: 1288490188}
+swap:
+  description: One entry per swap area that was re-created.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - {device: /dev/mapper/vg00-swap, bytes: 2147483648, msg: recreated}
+reclaimed_bytes:
+  description: Bytes trimmed or zero-filled in total.
+  returned: always
+  type: int
+'''
+
+import errno
+import os
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_native
+
+ZERO_FILL_NAME = '.template_zero_fill'
+TRIMMED_PATTERN = re.compile(r'\((\d+) bytes\) trimmed')
+
+
+def unescape_mount(path):
+    """Decode the octal escapes /proc/mounts uses for spaces and tabs"""
+    return re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), path)
+
+
+class FreeSpaceReclaimer(object):
+    """Trims or zero-fills free space and collects the report"""
+
+    def __init__(self, module):
+        self.module = module
+        self.params = module.params
+        self.check_mode = module.check_mode
+        self.filesystems = []
+        self.swap = []
+
+    def mounts(self):
+        """Writable local filesystems, one mount per device"""
+        seen = set()
+        with open('/proc/self/mounts', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 4:
+                    continue
+                device, mount, fstype, options = fields[0], unescape_mount(fields[1]), fields[2], fields[3]
+                if fstype not in self.params['fstypes'] or 'ro' in options.split(','):
+                    continue
+                if device in seen:
+                    continue
+                seen.add(device)
+                yield device, mount, fstype
+
+    @staticmethod
+    def supports_discard(device):
+        """Whether the block device (or its parent disk) accepts discards"""
+        try:
+            rdev = os.stat(device).st_rdev
+        except OSError:
+            return False
+        sys_dev = '/sys/dev/block/%d:%d' % (os.major(rdev), os.minor(rdev))
+        for queue in (os.path.join(sys_dev, 'queue'), os.path.join(sys_dev, '..', 'queue')):
+            try:
+                with open(os.path.join(queue, 'discard_max_bytes'), 'r') as f:
+                    return int(f.read().strip() or 0) > 0
+            except (IOError, OSError, ValueError):
+                continue
+        return False
+
+    def trim(self, mount):
+        fstrim = self.module.get_bin_path('fstrim', required=True, opt_dirs=['/usr/sbin', '/sbin'])
+        rc, out, err = self.module.run_command([fstrim, '-v', mount])
+        if rc != 0:
+            return None, (err or out).strip()
+        match = TRIMMED_PATTERN.search(out)
+        return int(match.group(1)) if match else 0, out.strip()
+
+    def zero_fill(self, mount):
+        """Write zeros into a file until the filesystem is full, then delete it"""
+        path = os.path.join(mount, ZERO_FILL_NAME)
+        chunk = b'\0' * (self.params['chunk_size'] * 1024 * 1024)
+        written = 0
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            while True:
+                try:
+                    count = os.write(fd, chunk)
+                except OSError as e:
+                    if e.errno in (errno.ENOSPC, errno.EDQUOT, errno.EFBIG):
+                        break
+                    raise
+                if count == 0:
+                    break
+                written += count
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+            os.unlink(path)
+        return written
+
+    @staticmethod
+    def free_bytes(mount):
+        stat = os.statvfs(mount)
+        return stat.f_bavail * stat.f_frsize
+
+    def reclaim_filesystems(self):
+        method = self.params['method']
+        for device, mount, fstype in self.mounts():
+            entry = dict(mount=mount, device=device, fstype=fstype, bytes=0)
+            discard = self.supports_discard(device)
+
+            if method == 'trim' or (method == 'auto' and discard):
+                entry['method'] = 'trim'
+                if not discard:
+                    entry['msg'] = 'device does not support discard'
+                elif self.check_mode:
+                    entry['msg'] = 'would trim'
+                else:
+                    trimmed, output = self.trim(mount)
+                    if trimmed is None:
+                        entry['msg'] = output
+                        # A failed trim is still worth a zero-fill in auto mode
+                        if method == 'auto':
+                            entry['method'] = 'zero'
+                            entry['bytes'] = self.zero_fill(mount)
+                    else:
+                        entry['bytes'] = trimmed
+                        entry['msg'] = output
+            else:
+                entry['method'] = 'zero'
+                if self.check_mode:
+                    entry['bytes'] = self.free_bytes(mount)
+                    entry['msg'] = 'would zero-fill'
+                else:
+                    entry['bytes'] = self.zero_fill(mount)
+
+            self.filesystems.append(entry)
+
+    def swap_areas(self):
+        try:
+            with open('/proc/swaps', 'r') as f:
+                lines = f.read().splitlines()[1:]
+        except (IOError, OSError):
+            return []
+        return [(unescape_mount(line.split()[0]), line.split()[1]) for line in lines if line.strip()]
+
+    def blkid(self, device, tag):
+        blkid = self.module.get_bin_path('blkid', opt_dirs=['/usr/sbin', '/sbin'])
+        if not blkid:
+            return ''
+        rc, out, err = self.module.run_command([blkid, '-o', 'value', '-s', tag, device])
+        return out.strip() if rc == 0 else ''
+
+    def zero_swap(self, device, kind):
+        """Overwrite a swap area with zeros, returning the bytes written"""
+        if kind == 'file':
+            size = os.path.getsize(device)
+        else:
+            fd = os.open(device, os.O_RDONLY)
+            try:
+                size = os.lseek(fd, 0, os.SEEK_END)
+            finally:
+                os.close(fd)
+
+        chunk = b'\0' * (self.params['chunk_size'] * 1024 * 1024)
+        written = 0
+        fd = os.open(device, os.O_WRONLY)
+        try:
+            while written < size:
+                written += os.write(fd, chunk[:min(len(chunk), size - written)])
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return written
+
+    def recreate_swap(self):
+        sbin = ['/usr/sbin', '/sbin']
+        for device, kind in self.swap_areas():
+            entry = dict(device=device, bytes=0)
+            self.swap.append(entry)
+            if self.check_mode:
+                entry['msg'] = 'would recreate zeroed'
+                continue
+
+            uuid = self.blkid(device, 'UUID')
+            label = self.blkid(device, 'LABEL')
+
+            rc, out, err = self.module.run_command([self.module.get_bin_path('swapoff', True, sbin), device])
+            if rc != 0:
+                # Not enough memory to move the pages out; leave this one alone
+                entry['msg'] = 'swapoff failed: %s' % (err or out).strip()
+                continue
+
+            try:
+                entry['bytes'] = self.zero_swap(device, kind)
+            finally:
+                mkswap = [self.module.get_bin_path('mkswap', True, sbin)]
+                if uuid:
+                    mkswap += ['-U', uuid]
+                if label:
+                    mkswap += ['-L', label]
+                self.module.run_command(mkswap + [device], check_rc=True)
+                self.module.run_command([self.module.get_bin_path('swapon', True, sbin), device], check_rc=True)
+            entry['msg'] = 'recreated'
+
+    def run(self):
+        self.reclaim_filesystems()
+        if self.params['swap']:
+            self.recreate_swap()
+
+        reclaimed = sum(entry['bytes'] for entry in self.filesystems + self.swap)
+        changed = reclaimed > 0 or (self.check_mode and bool(self.filesystems or self.swap))
+        return dict(changed=changed, filesystems=self.filesystems, swap=self.swap, reclaimed_bytes=reclaimed)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            method=dict(type='str', default='auto', choices=['auto', 'trim', 'zero']),
+            swap=dict(type='bool', default=True),
+            fstypes=dict(type='list', elements='str', default=['xfs', 'ext4', 'ext3', 'ext2']),
+            chunk_size=dict(type='int', default=1),
+        ),
+        supports_check_mode=True,
+    )
+
+    reclaimer = FreeSpaceReclaimer(module)
+    try:
+        result = reclaimer.run()
+    except (IOError, OSError) as e:
+        module.fail_json(msg='Reclaiming free space failed: %s' % to_native(e),
+                         filesystems=reclaimer.filesystems, swap=reclaimer.swap)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
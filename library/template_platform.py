@@ -0,0 +1,319 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License (see LICENSE)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: template_platform
+short_description: Detect the hypervisor and platform of a template build in one pass
+description:
+  - Reads DMI, SCSI and PCI vendors, the CPUID hypervisor leaf and container
+    markers in one module invocation and returns a compact
+    C(template_platform) fact.
+  - Also returns the kernel release, architecture, default interface and the
+    LVM logical volumes from sysfs, so the role only needs the
+    C(distribution) fact subset from C(setup).
+  - Read-only, supports check mode.
+options:
+  account:
+    description:
+      - Local account whose home directory may hold C(.vbox_version), which
+        Packer uploads with the VirtualBox guest additions ISO.
+    type: str
+    default: ''
+  root:
+    description: Path prefix of the system to inspect, e.g. a fake sysfs tree.
+    type: path
+    default: /
+author:
+  - Orcun Atakan (@oatakan)
+'''
+
+EXAMPLES = r'''
+- name: Detect the platform
+  template_platform:
+    account: "{{ local_account_username }}"
+
+- name: Show the hypervisor
+  ansible.builtin.debug:
+    msg: "{{ template_platform.hypervisor or 'bare metal' }}"
+'''
+
+RETURN = r'''
+ansible_facts:
+  description: Facts added to the host.
+  returned: always
+  type: dict
+  contains:
+    template_platform:
+      description: Platform of the build.
+      type: dict
+      sample:
+        container: false
+        container_type: ''
+        hypervisor: vmware
+        virtual: true
+        evidence: ["dmi: VMware, Inc. VMware7,1", "cpuid: VMwareVMware", "scsi: VMware"]
+        sys_vendor: VMware, Inc.
+        product_name: VMware7,1
+        bios_vendor: VMware, Inc.
+        cpuid_signature: VMwareVMware
+        scsi_vendors: [VMware]
+        kernel: 5.14.0-503.11.1.el9_5.x86_64
+        architecture: x86_64
+        default_interface: ens192
+        virtualbox_version: ''
+        lvs: {root: {vg: vg00}, swap: {vg: vg00}}
+'''
+
+import glob
+import os
+import platform
+import struct
+
+from ansible.module_utils.basic import AnsibleModule
+
+# Substrings of the DMI system vendor, product name or BIOS vendor
+DMI_HYPERVISORS = (
+    ('VMware', 'vmware'),
+    ('innotek', 'virtualbox'),
+    ('VirtualBox', 'virtualbox'),
+    ('Parallels', 'parallels'),
+    ('QEMU', 'kvm'),
+    ('KVM', 'kvm'),
+    ('oVirt', 'kvm'),
+    ('RHEV', 'kvm'),
+    ('OpenStack', 'kvm'),
+    ('Google', 'kvm'),
+    ('Xen', 'xen'),
+    ('Apple Virtual', 'apple'),
+    ('Microsoft Corporation Virtual Machine', 'hyperv'),
+)
+
+# Vendor signature of CPUID leaf 0x40000000
+CPUID_HYPERVISORS = {
+    'VMwareVMware': 'vmware',
+    'VBoxVBoxVBox': 'virtualbox',
+    'KVMKVMKVM': 'kvm',
+    'Linux KVM Hv': 'kvm',
+    'TCGTCGTCGTCG': 'qemu',
+    'Microsoft Hv': 'hyperv',
+    'XenVMMXenVMM': 'xen',
+    'prl hyperv': 'parallels',
+    'lrpepyh  vr': 'parallels',
+    'bhyve bhyve': 'bhyve',
+}
+
+SCSI_HYPERVISORS = {
+    'VMware': 'vmware',
+    'VBOX': 'virtualbox',
+    'QEMU': 'kvm',
+    'Msft': 'hyperv',
+}
+
+# PCI vendor IDs of emulated devices; virtio (0x1af4) is left out because
+# KVM and Apple's Virtualization.framework both use it
+PCI_HYPERVISORS = {
+    '0x15ad': 'vmware',
+    '0x80ee': 'virtualbox',
+    '0x1ab8': 'parallels',
+}
+
+CONTAINER_CGROUP_MARKERS = (
+    ('docker', 'docker'),
+    ('libpod', 'podman'),
+    ('kubepods', 'kubernetes'),
+    ('lxc', 'lxc'),
+)
+
+
+class PlatformDetector(object):
+    """Collects the platform markers and classifies them"""
+
+    def __init__(self, module):
+        self.module = module
+        self.root = module.params['root']
+        self.evidence = []
+
+    def path(self, *parts):
+        return os.path.join(self.root, *[part.lstrip('/') for part in parts])
+
+    def read(self, path, binary=False):
+        try:
+            with open(self.path(path), 'rb' if binary else 'r') as f:
+                return f.read() if binary else f.read().strip()
+        except (IOError, OSError):
+            return b'' if binary else ''
+
+    def glob(self, pattern):
+        """Matches of pattern under root, as paths relative to root"""
+        return sorted('/' + os.path.relpath(path, self.root) for path in glob.glob(self.path(pattern)))
+
+    def dmi(self):
+        return dict((key, self.read('/sys/class/dmi/id/%s' % key))
+                    for key in ('sys_vendor', 'product_name', 'bios_vendor'))
+
+    def scsi_vendors(self):
+        vendors = set(self.read(path) for path in self.glob('/sys/bus/scsi/devices/*/vendor'))
+        if not vendors:
+            # Kernels without the sysfs attributes still list them here
+            for line in self.read('/proc/scsi/scsi').splitlines():
+                if 'Vendor:' in line:
+                    vendors.add(line.split('Vendor:', 1)[1].split('Model:', 1)[0].strip())
+        return sorted(vendor for vendor in vendors if vendor)
+
+    def pci_vendors(self):
+        return sorted(set(self.read(path) for path in self.glob('/sys/bus/pci/devices/*/vendor')))
+
+    def hypervisor_flag(self):
+        for line in self.read('/proc/cpuinfo').splitlines():
+            if line.startswith('flags'):
+                return 'hypervisor' in line.split()
+        return False
+
+    def cpuid_signature(self):
+        """Vendor signature of CPUID leaf 0x40000000 through the cpuid driver"""
+        if platform.machine() not in ('x86_64', 'i386', 'i686') or not self.hypervisor_flag():
+            return ''
+        try:
+            fd = os.open(self.path('/dev/cpu/0/cpuid'), os.O_RDONLY)
+        except OSError:
+            return ''
+        try:
+            os.lseek(fd, 0x40000000, os.SEEK_SET)
+            data = os.read(fd, 16)
+        except OSError:
+            return ''
+        finally:
+            os.close(fd)
+        if len(data) != 16:
+            return ''
+        signature = struct.pack('<3I', *struct.unpack('<4I', data)[1:])
+        return signature.rstrip(b'\0').decode('ascii', 'replace').strip()
+
+    def container(self):
+        """Container type, or '' outside containers"""
+        systemd = self.read('/run/systemd/container')
+        if systemd:
+            return systemd
+        if os.path.exists(self.path('/.dockerenv')):
+            return 'docker'
+        if os.path.exists(self.path('/run/.containerenv')):
+            return 'podman'
+        for variable in self.read('/proc/1/environ', binary=True).split(b'\0'):
+            if variable.startswith(b'container='):
+                return variable.split(b'=', 1)[1].decode('utf-8', 'replace') or 'container'
+        cgroup = self.read('/proc/1/cgroup')
+        for marker, name in CONTAINER_CGROUP_MARKERS:
+            if marker in cgroup:
+                return name
+        return ''
+
+    def default_interface(self):
+        """Interface of the IPv4 default route with the lowest metric"""
+        routes = []
+        for line in self.read('/proc/net/route').splitlines()[1:]:
+            fields = line.split()
+            if len(fields) >= 8 and fields[1] == '00000000' and fields[7] == '00000000':
+                routes.append((int(fields[6]), fields[0]))
+        return min(routes)[1] if routes else ''
+
+    @staticmethod
+    def split_dm_name(name):
+        """Split a device-mapper name like vg--data-root into (vg-data, root)"""
+        index = 0
+        while index < len(name):
+            if name[index] == '-':
+                if name[index + 1:index + 2] == '-':
+                    index += 2
+                    continue
+                return name[:index].replace('--', '-'), name[index + 1:].replace('--', '-')
+            index += 1
+        return None, None
+
+    def lvs(self):
+        """Logical volumes from sysfs, without an LVM scan"""
+        volumes = {}
+        for dm in self.glob('/sys/block/dm-*/dm'):
+            if not self.read(os.path.join(dm, 'uuid')).startswith('LVM-'):
+                continue
+            vg, lv = self.split_dm_name(self.read(os.path.join(dm, 'name')))
+            if lv:
+                volumes[lv] = dict(vg=vg)
+        return volumes
+
+    def virtualbox_version(self):
+        account = self.module.params['account']
+        if not account:
+            return ''
+        return self.read('/home/%s/.vbox_version' % account)
+
+    def classify(self, dmi, cpuid, scsi, pci):
+        """First hypervisor named by DMI, CPUID, SCSI or PCI vendors"""
+        candidates = []
+        dmi_text = ' '.join(value for value in dmi.values() if value)
+        for marker, name in DMI_HYPERVISORS:
+            if marker in dmi_text:
+                candidates.append(name)
+                self.evidence.append('dmi: %s %s' % (dmi['sys_vendor'], dmi['product_name']))
+                break
+        if cpuid:
+            self.evidence.append('cpuid: %s' % cpuid)
+            if cpuid in CPUID_HYPERVISORS:
+                candidates.append(CPUID_HYPERVISORS[cpuid])
+        for vendor in scsi:
+            if vendor in SCSI_HYPERVISORS:
+                candidates.append(SCSI_HYPERVISORS[vendor])
+                self.evidence.append('scsi: %s' % vendor)
+        for vendor in pci:
+            if vendor in PCI_HYPERVISORS:
+                candidates.append(PCI_HYPERVISORS[vendor])
+                self.evidence.append('pci: %s' % vendor)
+        return candidates[0] if candidates else ''
+
+    def run(self):
+        dmi = self.dmi()
+        cpuid = self.cpuid_signature()
+        scsi = self.scsi_vendors()
+        pci = self.pci_vendors()
+        container = self.container()
+        if container:
+            self.evidence.append('container: %s' % container)
+        hypervisor = self.classify(dmi, cpuid, scsi, pci)
+
+        facts = dict(
+            container=bool(container),
+            container_type=container,
+            hypervisor=hypervisor,
+            virtual=bool(hypervisor) or self.hypervisor_flag(),
+            evidence=self.evidence,
+            cpuid_signature=cpuid,
+            scsi_vendors=scsi,
+            kernel=platform.release(),
+            architecture=platform.machine(),
+            default_interface=self.default_interface(),
+            virtualbox_version=self.virtualbox_version(),
+            lvs=self.lvs(),
+        )
+        facts.update(dmi)
+        return dict(changed=False, ansible_facts=dict(template_platform=facts))
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            account=dict(type='str', default=''),
+            root=dict(type='path', default='/'),
+        ),
+        supports_check_mode=True,
+    )
+
+    module.exit_json(**PlatformDetector(module).run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License (see LICENSE)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: template_seal
+short_description: Seal a RHEL-family system before it is turned into a template
+description:
+  - Runs the whole template sealing phase in one module invocation instead of
+    one task per step.
+  - Flags the system for re-configuration, resets the hostname, removes
+    interface persistence, rotates and deletes logs, truncates the audit log
+    and wtmp and removes the SSH host keys.
+  - Returns a per-step report and supports check mode.
+options:
+  container:
+    description:
+      - Whether the target is a container.
+      - Containers keep their network configuration, SSH host keys and
+        re-configuration flag, and hostname write failures are tolerated.
+    type: bool
+    default: false
+  interface:
+    description: Network interface whose NetworkManager and ifcfg files are reset.
+    type: str
+    default: eth0
+  hostname:
+    description: Hostname written to /etc/hostname.
+    type: str
+    default: localhost.localdomain
+  log_patterns:
+    description: Shell patterns of rotated log files deleted from /var/log.
+    type: list
+    elements: str
+    default: ['*-????????', '*.gz']
+  root:
+    description:
+      - Path prefix of the system to seal, e.g. a mounted image.
+      - logrotate only runs when this is C(/).
+    type: path
+    default: /
+author:
+  - Orcun Atakan (@oatakan)
+'''
+
+EXAMPLES = r'''
+- name: Seal the template
+  template_seal:
+    container: "{{ is_container }}"
+    interface: "{{ ansible_default_ipv4.interface | default('eth0') }}"
+'''
+
+RETURN = r'''
+steps:
+  description: One entry per sealing step, in the order they ran.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - {name: hostname, changed: true, skipped: false, msg: "set to localhost.localdomain"}
+    - {name: ssh_host_keys, changed: false, skipped: true, msg: "container"}
+hostname:
+  description: Content of /etc/hostname after sealing.
+  returned: always
+  type: str
+'''
+
+import fnmatch
+import glob
+import os
+import re
+import shutil
+import tempfile
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_native
+
+IFCFG_REMOVED_KEYS = ('HWADDR', 'UUID', 'IPADDR', 'NETMASK', 'GATEWAY')
+
+
+class TemplateSealer(object):
+    """Runs the sealing steps and collects their report"""
+
+    def __init__(self, module):
+        self.module = module
+        self.params = module.params
+        self.check_mode = module.check_mode
+        self.container = module.params['container']
+        self.root = module.params['root']
+        self.steps = []
+
+    def path(self, *parts):
+        return os.path.join(self.root, *[part.lstrip('/') for part in parts])
+
+    def report(self, name, changed=False, skipped=False, msg='', **extra):
+        step = dict(name=name, changed=changed, skipped=skipped, msg=msg)
+        step.update(extra)
+        self.steps.append(step)
+
+    def remove(self, path):
+        if not os.path.lexists(path):
+            return False
+        if not self.check_mode:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+        return True
+
+    def write_file(self, path, content, mode=0o644, unsafe_writes=False):
+        """Replace a file through a temporary file and atomic_move, which keeps
+        the SELinux context and ownership of the file it replaces; with
+        unsafe_writes a file that cannot be renamed over is written in place"""
+        directory = os.path.dirname(path)
+        fd, tmp_path = tempfile.mkstemp(prefix='.seal.', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            self.module.atomic_move(tmp_path, path, unsafe_writes=unsafe_writes)
+        finally:
+            # atomic_move fails the module without removing its source
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        os.chmod(path, mode)
+
+    def reconfigure_flag(self):
+        if self.container:
+            return self.report('reconfigure_flag', skipped=True, msg='container')
+        path = self.path('/.unconfigured')
+        if os.path.exists(path):
+            return self.report('reconfigure_flag', msg='%s exists' % path)
+        if not self.check_mode:
+            open(path, 'a').close()
+            os.chmod(path, 0o644)
+        self.report('reconfigure_flag', changed=True, msg='created %s' % path)
+
+    def hostname(self):
+        path = self.path('/etc/hostname')
+        wanted = self.params['hostname']
+        current = None
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                current = f.read()
+        if current == wanted:
+            return self.report('hostname', msg='already %s' % wanted)
+        if self.check_mode:
+            return self.report('hostname', changed=True, msg='would set to %s' % wanted)
+
+        # /etc/hostname is often bind-mounted in containers, and a rename over a
+        # mount point fails with EBUSY inside atomic_move, so write it in place.
+        # A bind mount from the same filesystem is not seen by ismount; there
+        # unsafe_writes keeps atomic_move from failing the module (2.16 and
+        # older) and anything it still raises (2.17+) falls back to in place
+        reason = 'container' if self.container else 'mount point' if os.path.ismount(path) else None
+        if reason is None:
+            try:
+                self.write_file(path, wanted, unsafe_writes=True)
+            except Exception as e:
+                reason = to_native(e)
+        if reason is not None:
+            try:
+                with open(path, 'w') as f:
+                    f.write(wanted)
+            except (IOError, OSError) as e:
+                if self.container:
+                    return self.report('hostname', msg='could not write %s: %s' % (path, to_native(e)))
+                self.module.fail_json(msg='Could not reset hostname: %s' % to_native(e), steps=self.steps)
+            return self.report('hostname', changed=True, msg='set to %s in place (%s)' % (wanted, reason))
+        self.report('hostname', changed=True, msg='set to %s' % wanted)
+
+    def udev_persistence(self):
+        path = self.path('/etc/udev/rules.d/70-persistent-net.rules')
+        changed = self.remove(path)
+        self.report('udev_persistence', changed=changed, msg='removed %s' % path if changed else 'absent')
+
+    def nm_connection(self):
+        if self.container:
+            return self.report('nm_connection', skipped=True, msg='container')
+        path = self.path('/etc/NetworkManager/system-connections/%s.nmconnection' % self.params['interface'])
+        changed = self.remove(path)
+        self.report('nm_connection', changed=changed, msg='removed %s' % path if changed else 'absent')
+
+    def ifcfg(self):
+        if self.container:
+            return self.report('ifcfg', skipped=True, msg='container')
+        path = self.path('/etc/sysconfig/network-scripts/ifcfg-%s' % self.params['interface'])
+        if not os.path.exists(path):
+            return self.report('ifcfg', skipped=True, msg='%s not found' % path)
+
+        with open(path, 'r') as f:
+            lines = f.read().splitlines()
+
+        removed = re.compile(r'^(%s)' % '|'.join(IFCFG_REMOVED_KEYS))
+        updated = [line for line in lines if not removed.match(line)]
+
+        # Like lineinfile: replace the last BOOTPROTO= line or append one
+        bootproto = [number for number, line in enumerate(updated) if line.startswith('BOOTPROTO=')]
+        if bootproto:
+            updated[bootproto[-1]] = 'BOOTPROTO=dhcp'
+        else:
+            updated.append('BOOTPROTO=dhcp')
+
+        if updated == lines:
+            return self.report('ifcfg', msg='%s already uses DHCP' % path)
+        if not self.check_mode:
+            self.write_file(path, '\n'.join(updated) + '\n', os.stat(path).st_mode & 0o7777)
+        self.report('ifcfg', changed=True, msg='reset %s to DHCP' % path)
+
+    def logrotate(self):
+        if self.root != '/':
+            return self.report('logrotate', skipped=True, msg='root is %s' % self.root)
+        if self.check_mode:
+            return self.report('logrotate', skipped=True, msg='check mode')
+        logrotate = self.module.get_bin_path('logrotate', opt_dirs=['/usr/sbin'])
+        if not logrotate:
+            return self.report('logrotate', skipped=True, msg='logrotate not found')
+        rc, out, err = self.module.run_command([logrotate, '-f', '/etc/logrotate.conf'])
+        # Failures are not fatal, the rotated files are still removed below
+        self.report('logrotate', changed=rc == 0, msg=(err or out).strip() or 'rotated', rc=rc)
+
+    def rotated_logs(self):
+        log_dir = self.path('/var/log')
+        try:
+            names = os.listdir(log_dir)
+        except OSError:
+            return self.report('rotated_logs', skipped=True, msg='%s not found' % log_dir)
+
+        removed = []
+        for name in sorted(names):
+            path = os.path.join(log_dir, name)
+            if not os.path.isfile(path) or os.path.islink(path):
+                continue
+            if any(fnmatch.fnmatch(name, pattern) for pattern in self.params['log_patterns']):
+                try:
+                    self.remove(path)
+                    removed.append(path)
+                except OSError:
+                    pass
+        self.report('rotated_logs', changed=bool(removed), msg='removed %d files' % len(removed), files=removed)
+
+    def truncate_logs(self):
+        truncated = []
+        for log in ('/var/log/audit/audit.log', '/var/log/wtmp'):
+            path = self.path(log)
+            # Like "cat /dev/null > file": create it if its directory exists
+            if not os.path.isdir(os.path.dirname(path)):
+                continue
+            if os.path.exists(path) and os.path.getsize(path) == 0:
+                continue
+            try:
+                if not self.check_mode:
+                    open(path, 'w').close()
+                truncated.append(path)
+            except (IOError, OSError):
+                pass
+        self.report('truncate_logs', changed=bool(truncated),
+                    msg='truncated %s' % ', '.join(truncated) if truncated else 'already empty', files=truncated)
+
+    def ssh_host_keys(self):
+        if self.container:
+            return self.report('ssh_host_keys', skipped=True, msg='container')
+        keys = sorted(glob.glob(self.path('/etc/ssh/ssh_host_*')))
+        for path in keys:
+            self.remove(path)
+        # Key names are reported, never their content
+        self.report('ssh_host_keys', changed=bool(keys), msg='removed %d files' % len(keys))
+
+    def run(self):
+        self.reconfigure_flag()
+        self.hostname()
+        self.udev_persistence()
+        self.nm_connection()
+        self.ifcfg()
+        self.logrotate()
+        self.rotated_logs()
+        self.truncate_logs()
+        self.ssh_host_keys()
+
+        hostname = ''
+        try:
+            with open(self.path('/etc/hostname'), 'r') as f:
+                hostname = f.read().strip()
+        except (IOError, OSError):
+            pass
+
+        changed = any(step['changed'] for step in self.steps)
+        return dict(changed=changed, steps=self.steps, hostname=hostname)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            container=dict(type='bool', default=False),
+            interface=dict(type='str', default='eth0'),
+            hostname=dict(type='str', default='localhost.localdomain'),
+            log_patterns=dict(type='list', elements='str', default=['*-????????', '*.gz']),
+            root=dict(type='path', default='/'),
+        ),
+        supports_check_mode=True,
+    )
+
+    try:
+        result = TemplateSealer(module).run()
+    except (IOError, OSError) as e:
+        module.fail_json(msg='Sealing failed: %s' % to_native(e))
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()